@@ -0,0 +1,149 @@
+import asyncio
+import datetime
+import logging
+import os
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from .database import AsyncSessionLocal
+from .resume_analyzer import ResumeAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# Analyses run at most this many at a time per process
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", 4))
+# Jobs waiting beyond this are rejected instead of queued
+ANALYSIS_QUEUE_SIZE = int(os.getenv("ANALYSIS_QUEUE_SIZE", 200))
+# Finished jobs are forgotten after this long (the analysis itself stays in the DB)
+ANALYSIS_JOB_TTL_SECONDS = int(os.getenv("ANALYSIS_JOB_TTL_SECONDS", 3600))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class AnalysisJob:
+    def __init__(self, user_id: int, resume_text: str, job_description: str,
+                 resume_id: Optional[int], match_mode: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.resume_text = resume_text
+        self.job_description = job_description
+        self.resume_id = resume_id
+        self.match_mode = match_mode
+
+        self.status = "queued"  # queued -> running -> completed | failed
+        self.analysis_id: Optional[int] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.datetime.utcnow()
+        self.finished_at: Optional[datetime.datetime] = None
+        self._finished_monotonic: Optional[float] = None
+        self.done = asyncio.Event()
+
+    def finish(self, status: str, analysis_id: Optional[int] = None, error: Optional[str] = None):
+        self.status = status
+        self.analysis_id = analysis_id
+        self.error = error
+        self.finished_at = datetime.datetime.utcnow()
+        self._finished_monotonic = time.monotonic()
+        # Inputs can be large; they are not needed once the job is done
+        self.resume_text = self.job_description = None
+        self.done.set()
+
+
+class AnalysisJobQueue:
+    """
+    In-process queue of resume analyses served by a fixed pool of worker tasks.
+    Job state lives in memory; results are the usual ResumeAnalysis rows.
+    """
+
+    def __init__(self, workers: int = ANALYSIS_WORKERS, max_queued: int = ANALYSIS_QUEUE_SIZE,
+                 ttl_seconds: int = ANALYSIS_JOB_TTL_SECONDS):
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.analyzer = ResumeAnalyzer()
+        self._queue: "asyncio.Queue[AnalysisJob]" = asyncio.Queue(maxsize=max_queued)
+        self._jobs: Dict[str, AnalysisJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, user_id: int, resume_text: str, job_description: str,
+               resume_id: Optional[int] = None, match_mode: str = "greedy") -> AnalysisJob:
+        self._prune()
+        job = AnalysisJob(user_id, resume_text, job_description, resume_id, match_mode)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError("Analysis queue is full, try again later")
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str, user_id: int) -> Optional[AnalysisJob]:
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    async def wait(self, job: AnalysisJob, timeout: float) -> AnalysisJob:
+        """
+        Wait up to timeout seconds for the job to finish (long polling).
+        """
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def stats(self) -> Dict:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "queued": self._queue.qsize(), "jobs": counts}
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job._finished_monotonic is not None and job._finished_monotonic < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def _worker(self, number: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                job.status = "running"
+                async with AsyncSessionLocal() as db:
+                    analysis = await self.analyzer.analyze_resume(
+                        job.resume_text,
+                        job.job_description,
+                        db,
+                        job.user_id,
+                        job.resume_id,
+                        match_mode=job.match_mode
+                    )
+                job.finish("completed", analysis_id=analysis.id)
+            except asyncio.CancelledError:
+                job.finish("failed", error="Server shutting down")
+                raise
+            except Exception:
+                # Details (which can include SQL and parameters) stay in the server log
+                logger.exception("Analysis job %s failed", job.id)
+                job.finish("failed", error="Analysis failed")
+            finally:
+                self._queue.task_done()
+
+
+analysis_queue = AnalysisJobQueue()
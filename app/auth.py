@@ -1,6 +1,9 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+import asyncio
 import os
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -10,41 +13,42 @@ from .database import get_db
 from . import models
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, inspect
 from sqlalchemy.future import select
+from sqlalchemy.orm import Session as OrmSession
 
+from .lru import LRUCache
+from .secret_store import get_secret
+
+# Security configurations (env var, secrets file or Secret Manager). They are
+# looked up on every use, so a rotated value applies once the store's cache expires.
+GCP_PROJECT_ID = "stalwart-star-448320-c8"
 
-from google.cloud import secretmanager
-# Initialize Google Secret Manager client
-def access_secret_version(secret_id: str, project_id="stalwart-star-448320-c8"):
-    """
-    Fetches a secret from Google Secret Manager.
-    """
-    client = secretmanager.SecretManagerServiceClient()
-    name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
-    
-    try:
-        response = client.access_secret_version(name=name)
-        return response.payload.data.decode("UTF-8")
-    except Exception as e:
-        print(f"Error retrieving secret {secret_id}: {e}")
-        return None
-    
 
-# Load secrets from Google Secret Manager
-GCP_PROJECT_ID = "stalwart-star-448320-c8" 
-# Security configurations
+def secret_key() -> str:
+    return get_secret("SECRET_KEY", GCP_PROJECT_ID)
 
-os.environ["SECRET_KEY"] = access_secret_version("SECRET_KEY") or GCP_PROJECT_ID
-os.environ["ALGORITHM"] = access_secret_version("ALGORITHM") or ""
 
-os.environ["ACCESS_TOKEN_EXPIRE_MINUTES"] = access_secret_version("ACCESS_TOKEN_EXPIRE_MINUTES")
+def jwt_algorithm() -> str:
+    return get_secret("ALGORITHM", "HS256")
 
 
-SECRET_KEY = os.getenv("SECRET_KEY") 
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))  # Default to 30 mins
+def access_token_expire_minutes() -> int:
+    return int(get_secret("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))  # Default to 30 mins
+
+
+# Validated tokens kept in process, so authenticated requests skip the user lookup
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", 1024))
+# Seconds a cached user is trusted (0 disables the cache). Changes made by
+# another instance are only seen once this expires.
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+
+# Threads running bcrypt. This caps the CPU a login burst can take; 0 hashes
+# on the event loop (only useful for debugging)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_password_executor: Optional[ThreadPoolExecutor] = None
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
@@ -57,6 +61,28 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+
+async def _run_password_hash(fn, *args):
+    """
+    Run a bcrypt call on the password threads (bcrypt releases the GIL), so
+    the event loop keeps serving other requests meanwhile.
+    """
+    global _password_executor
+    if PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="passwords")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, fn, *args)
+
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_password_hash(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password):
+    return await _run_password_hash(get_password_hash, password)
+
 # def get_user(db: Session, username: str):
 #     return db.query(models.User).filter(models.User.username == username).first()
 
@@ -69,7 +95,7 @@ async def authenticate_user(db: Session, username: str, password: str):
     user = await get_user(db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     return user
 
@@ -80,17 +106,82 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, secret_key(), algorithm=jwt_algorithm())
     return encoded_jwt
 
+class AuthCache:
+    """
+    Bounded LRU of validated tokens to snapshots of their user's columns.
+    Entries expire after the TTL or when the token does, whichever is first,
+    and are dropped when the user row is changed or deleted through the ORM.
+    """
+
+    def __init__(self, max_size: int = AUTH_CACHE_SIZE, ttl_seconds: float = AUTH_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(max_size)
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[models.User]:
+        snapshot = self._entries.get(token)
+        # A fresh detached copy, so nothing a request does to it is shared
+        return models.User(**snapshot) if snapshot is not None else None
+
+    def put(self, token: str, user: models.User, token_expires_at: Optional[float] = None):
+        if self.ttl_seconds <= 0:
+            return
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        snapshot = {column.key: getattr(user, column.key) for column in inspect(models.User).column_attrs}
+        self._entries.put(token, snapshot, expires_at=time.monotonic() + ttl)
+
+    def invalidate_user(self, user_id: int):
+        stale = [token for token, snapshot in self._entries.items() if snapshot["id"] == user_id]
+        for token in stale:
+            self._entries.pop(token)
+        self.invalidations += len(stale)
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        return dict(self._entries.stats(), ttl_seconds=self.ttl_seconds, invalidations=self.invalidations)
+
+
+auth_cache = AuthCache()
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _invalidate_changed_users(session, flush_context):
+    # Deactivation, password or username changes, deletion
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.User) and obj.id is not None:
+            auth_cache.invalidate_user(obj.id)
+
+
+@event.listens_for(OrmSession, "do_orm_execute")
+def _invalidate_on_bulk_change(orm_execute_state):
+    # Bulk UPDATE/DELETE statements do not go through the flush
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            orm_execute_state.bind_mapper is inspect(models.User):
+        auth_cache.clear()
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    # Only tokens that passed the checks below are cached, and never past their expiry
+    cached = auth_cache.get(token)
+    if cached is not None:
+        return cached
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, secret_key(), algorithms=[jwt_algorithm()])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -100,6 +191,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     user = await get_user(db, username=token_data.username)
     if user is None:
         raise credentials_exception
+    auth_cache.put(token, user, payload.get("exp"))
     return user
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
@@ -1,50 +1,151 @@
+import math
 import os
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import time
+from collections import deque
+from typing import Dict
+from uuid import uuid4
 
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.secret_store import get_secret
+
+# Env var, secrets file or Secret Manager. Refuse to start without one: an
+# unreachable Secret Manager must not put the service on a throwaway SQLite file.
+# For local development set USE_LOCAL_SQLITE=true, or put DATABASE_URL in SECRETS_FILE.
+LOCAL_SQLITE_URL = "sqlite+aiosqlite:///./resumegpt.db"
+USE_LOCAL_SQLITE = os.getenv("USE_LOCAL_SQLITE", "false").lower() == "true"
+DATABASE_URL = get_secret("DATABASE_URL") or (LOCAL_SQLITE_URL if USE_LOCAL_SQLITE else None)
+if not DATABASE_URL:
+    raise RuntimeError(
+        "DATABASE_URL could not be resolved from the environment, the secrets file or Secret Manager "
+        "(set USE_LOCAL_SQLITE=true to use a local SQLite database)"
+    )
+
+# Connection pool. Keep DB_POOL_SIZE + DB_MAX_OVERFLOW per instance below the
+# server's connection limit divided by the number of instances.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds; below the server/proxy idle timeout
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Prepared statements cached per asyncpg connection (SQLAlchemy's
+# prepared_statement_cache_size). Set to 0 behind PgBouncer in transaction mode:
+# that also turns off asyncpg's own cache and gives every prepared statement a
+# unique name, so statements never collide on a server connection shared by clients
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+
+class PoolMetrics:
+    """
+    Counters for connection checkouts and how long callers waited for one.
+    """
 
-from google.cloud import secretmanager
-# Initialize Google Secret Manager client
-def access_secret_version(secret_id: str, project_id="stalwart-star-448320-c8"):
+    def __init__(self, window: int = 1000):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent = deque(maxlen=window)
+
+    def record_wait(self, seconds: float):
+        self.checkouts += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+        self._recent.append(seconds)
+
+    def reset(self):
+        self.__init__(self._recent.maxlen)
+
+    def stats(self, pool) -> Dict:
+        recent = sorted(self._recent)
+
+        def percentile(pct):
+            if not recent:
+                return 0.0
+            # Nearest-rank percentile
+            return round(recent[max(0, math.ceil(pct / 100 * len(recent)) - 1)] * 1000, 3)
+
+        return {
+            "pool_size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_p50": percentile(50),
+            "wait_ms_p99": percentile(99),
+            "wait_ms_max": round(self.max_wait * 1000, 3)
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
     """
-    Fetches a secret from Google Secret Manager.
+    The default async queue pool, timing how long each checkout waits.
     """
-    client = secretmanager.SecretManagerServiceClient()
-    name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
-    
-    try:
-        response = client.access_secret_version(name=name)
-        return response.payload.data.decode("UTF-8")
-    except Exception as e:
-        print(f"Error retrieving secret {secret_id}: {e}")
-        return None
-    
 
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - start)
+
+
+def _engine_options(url: str) -> Dict:
+    options = {"echo": DB_ECHO}
+    if ":memory:" in url or url.endswith("sqlite+aiosqlite://"):
+        # One shared connection; pool settings do not apply
+        return options
+
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    if url.startswith("postgresql+asyncpg"):
+        connect_args = {"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+        if DB_STATEMENT_CACHE_SIZE == 0:
+            connect_args.update(
+                statement_cache_size=0,
+                prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__"
+            )
+        options["connect_args"] = connect_args
+    return options
 
-# Load secrets from Google Secret Manager
-GCP_PROJECT_ID = "stalwart-star-448320-c8" 
-os.environ["DATABASE_URL"] = access_secret_version("DATABASE_URL") or ""
-# Get DATABASE_URL from .env (default to SQLite if not found)
-DATABASE_URL = os.getenv("DATABASE_URL")
 
 # Create async database engine
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 
-# Create session factory
-AsyncSessionLocal = sessionmaker(
-    bind=engine, class_=AsyncSession, expire_on_commit=False
-)
 
-# Define Base for ORM models
-Base = declarative_base()
+@event.listens_for(engine.sync_engine, "connect")
+def _count_connect(dbapi_connection, connection_record):
+    pool_metrics.connects += 1
 
 
+def get_pool_stats() -> Dict:
+    return pool_metrics.stats(engine.pool)
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import sessionmaker
 
+# Define Base for ORM models
+Base = declarative_base()
 
+# Create session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -63,7 +164,3 @@ async def get_db():
 # async def get_db():
 #     async with AsyncSessionLocal() as db:
 #         yield db  # Yield async session
-
-
-
-
@@ -1,14 +1,26 @@
+from .profiling import STARTUP_PROFILE, startup_profile  # first, so it sees every other import
 import asyncio
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 from .database import engine, Base
-from .routers import users, auth, resume
+from .routers import users, auth, resume, metrics
+from .ml.embeddings import get_backend as get_embedding_backend
+from .analysis_jobs import analysis_queue
+from .pdf_extraction import shutdown_pdf_pool
+from .storage import get_storage
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+startup_profile.mark("imports_done")
+
+# Set to false once the schema is managed outside the app; create_all costs a
+# round trip per table on every cold start
+CREATE_TABLES_ON_STARTUP = os.getenv("CREATE_TABLES_ON_STARTUP", "true").lower() == "true"
+
 # Initialize FastAPI app
 app = FastAPI(title="ResumeGPT API")
 
@@ -33,6 +45,16 @@ app.add_middleware(
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(resume.router)
+app.include_router(metrics.router)
+
+if STARTUP_PROFILE:
+    @app.middleware("http")
+    async def profile_first_request(request: Request, call_next):
+        response = await call_next(request)
+        if "first_request" not in startup_profile.milestones:
+            startup_profile.mark("first_request")
+            print("Startup profile:", startup_profile.report())
+        return response
 
 @app.get("/")
 async def read_root():
@@ -43,7 +65,30 @@ async def create_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+async def check_database():
+    # Opens the first pooled connection so the first request does not pay for it
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
 # ✅ Run the async table creation before app starts
 @app.on_event("startup")
 async def startup_event():
-    await create_tables()
+    with startup_profile.phase("db_ready"):
+        if CREATE_TABLES_ON_STARTUP:
+            await create_tables()
+        else:
+            await check_database()
+    # Load the embedding model once (a no-op for the HTTP backend)
+    loop = asyncio.get_running_loop()
+    with startup_profile.phase("embedding_model"):
+        await loop.run_in_executor(None, get_embedding_backend().load)
+    await analysis_queue.start()
+    startup_profile.mark("ready")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await analysis_queue.stop()
+    shutdown_pdf_pool()
+    await get_storage().close()
+    await get_embedding_backend().close()
+    await engine.dispose()
@@ -0,0 +1,206 @@
+"""
+One-off data migrations for existing databases.
+
+Skill columns on resume_analyses used to be written as JSON-encoded strings
+inside the JSON column ("[\"python\"]" rather than ["python"]). The steps:
+
+1. Schema (skipped with --skip-ddl). Adding match_score only touches the
+   catalog. On Postgres, converting the skill columns from json to jsonb
+   rewrites the whole table under an ACCESS EXCLUSIVE lock: every read and
+   write of resume_analyses waits until it finishes. Run it in a maintenance
+   window or at low traffic; it gives up after DDL_LOCK_TIMEOUT rather than
+   queueing everyone behind a long transaction. Later runs skip columns
+   that are already jsonb.
+2. Rows are rewritten as native arrays in small batches, each in its own
+   transaction, so no row lock is held for long. The same pass (re)computes
+   match_score for every analysis, and each resume then takes the score of
+   its latest analysis. Safe while the app is serving traffic.
+3. Indexes create_all does not add to existing tables are built
+   (CONCURRENTLY on Postgres, so the tables stay writable).
+
+    python -m app.migrations --batch-size 500
+    python -m app.migrations --skip-ddl     # rewrite rows only
+"""
+import argparse
+import asyncio
+import json
+from typing import Optional
+
+from sqlalchemy import func, inspect, select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from . import models
+from .resume_analyzer import compute_match_score
+
+# How long schema changes wait for their table lock before giving up
+DDL_LOCK_TIMEOUT = "5s"
+
+SKILL_COLUMNS = ("matched_tech_skills", "matched_soft_skills", "missing_tech_skills", "missing_soft_skills")
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_resume_analyses_user_created_id ON resume_analyses (user_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_resume_analyses_resume_id ON resume_analyses (resume_id)",
+    "CREATE INDEX IF NOT EXISTS ix_resumes_user_created_at ON resumes (user_id, created_at DESC)",
+)
+
+POSTGRES_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_resume_analyses_missing_tech_skills "
+    "ON resume_analyses USING gin (missing_tech_skills jsonb_path_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_resume_analyses_missing_soft_skills "
+    "ON resume_analyses USING gin (missing_soft_skills jsonb_path_ops)",
+)
+
+
+def _unwrap(value):
+    # Undo any number of json.dumps layers; leave anything else as it is
+    while isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            break
+    return value
+
+
+async def add_missing_columns(engine: AsyncEngine):
+    """
+    Add columns introduced after resume_analyses was created.
+    """
+    async with engine.begin() as conn:
+        existing = await conn.run_sync(
+            lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns("resume_analyses")}
+        )
+        if "match_score" not in existing:
+            print("Adding resume_analyses.match_score")
+            await conn.execute(text("ALTER TABLE resume_analyses ADD COLUMN match_score FLOAT"))
+
+
+async def rewrite_analyses(engine: AsyncEngine, batch_size: int = 500) -> int:
+    """
+    Rewrite double-encoded skill lists as native JSON arrays and recompute
+    match scores, batch_size rows per transaction. Returns the number of rows
+    changed; safe to re-run.
+    """
+    table = models.ResumeAnalysis.__table__
+    columns = [table.c[name] for name in SKILL_COLUMNS]
+    last_id = 0
+    changed = 0
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(
+                select(table.c.id, table.c.match_score, *columns)
+                .where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+            )).all()
+            if not rows:
+                return changed
+            for row in rows:
+                skills = {name: _unwrap(row._mapping[name]) for name in SKILL_COLUMNS}
+                values = {name: value for name, value in skills.items() if value != row._mapping[name]}
+                # Also corrects scores stored before matched job skills were deduplicated
+                score = compute_match_score(skills)
+                if score != row.match_score:
+                    values["match_score"] = score
+                if values:
+                    await conn.execute(update(table).where(table.c.id == row.id).values(**values))
+                    changed += 1
+            last_id = rows[-1].id
+        print(f"Rewrote analyses up to {last_id} ({changed} rows changed)")
+
+
+async def refresh_resume_scores(engine: AsyncEngine, batch_size: int = 500):
+    """
+    Set each resume's match_score to that of its latest analysis, for
+    batch_size resumes per transaction.
+    """
+    resumes = models.Resume.__table__
+    analyses = models.ResumeAnalysis.__table__
+    latest_score = select(analyses.c.match_score).where(
+        analyses.c.resume_id == resumes.c.id
+    ).order_by(analyses.c.created_at.desc(), analyses.c.id.desc()).limit(1).scalar_subquery()
+
+    async with engine.connect() as conn:
+        max_id = (await conn.execute(select(func.max(resumes.c.id)))).scalar() or 0
+    for last_id in range(0, max_id, batch_size):
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(resumes).where(
+                    resumes.c.id > last_id,
+                    resumes.c.id <= last_id + batch_size,
+                    select(analyses.c.id).where(analyses.c.resume_id == resumes.c.id).exists()
+                ).values(match_score=latest_score)
+            )
+    print(f"Refreshed resume scores up to {max_id}")
+
+
+async def convert_skill_columns_to_jsonb(engine: AsyncEngine):
+    """
+    Postgres: change skill columns still typed json to jsonb. Values are kept
+    as they are; double-encoded ones become JSONB strings until unwrapped.
+    Blocking: the table is rewritten under an ACCESS EXCLUSIVE lock.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT}'"))
+        result = await conn.execute(text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = 'resume_analyses' AND data_type = 'json'"
+        ))
+        for (column,) in result.all():
+            if column in SKILL_COLUMNS:
+                print(f"Converting resume_analyses.{column} to jsonb (table locked until done)")
+                await conn.execute(text(
+                    f"ALTER TABLE resume_analyses ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb"
+                ))
+
+
+async def create_indexes(engine: AsyncEngine):
+    """
+    Build the history, recent-uploads and skill indexes on existing tables.
+    """
+    if engine.dialect.name != "postgresql":
+        async with engine.begin() as conn:
+            for statement in INDEXES:
+                await conn.execute(text(statement))
+        return
+
+    # CONCURRENTLY keeps the table writable, but cannot run inside a transaction
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in INDEXES + POSTGRES_INDEXES:
+            await conn.execute(text(statement.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+
+
+async def run(batch_size: int = 500, skip_ddl: bool = False, engine: Optional[AsyncEngine] = None):
+    if engine is None:
+        from .database import engine
+    if not skip_ddl:
+        await add_missing_columns(engine)
+        if engine.dialect.name == "postgresql":
+            await convert_skill_columns_to_jsonb(engine)
+
+    changed = await rewrite_analyses(engine, batch_size)
+    print(f"Analyses: {changed} rows rewritten")
+    await refresh_resume_scores(engine, batch_size)
+
+    # Indexes last, so the GIN indexes are built over the rewritten arrays
+    if not skip_ddl:
+        await create_indexes(engine)
+        print("Schema up to date")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per transaction")
+    parser.add_argument("--skip-ddl", action="store_true", help="only rewrite rows")
+    args = parser.parse_args()
+
+    async def migrate():
+        from .database import engine
+        try:
+            await run(args.batch_size, args.skip_ddl, engine)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(migrate())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from ..secret_store import get_secret
+
+# "huggingface" calls the hosted Inference API, "local" runs MiniLM in process
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface").lower()
+
+# Hugging Face Model ID
+MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+API_URL = os.getenv("HF_API_URL", f"https://api-inference.huggingface.co/pipeline/feature-extraction/{MODEL_ID}")
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", 60))
+
+# Directory holding the ONNX export of the model (model.onnx) and its tokenizer.json
+EMBEDDING_MODEL_DIR = os.getenv("EMBEDDING_MODEL_DIR", "models/all-MiniLM-L6-v2")
+EMBEDDING_MAX_TOKENS = int(os.getenv("EMBEDDING_MAX_TOKENS", 128))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", 0))  # 0 lets onnxruntime decide
+
+
+class EmbeddingBackend:
+    """
+    Turns a batch of strings into sentence embeddings, one row per string.
+    """
+    name = "base"
+
+    def load(self):
+        """
+        Blocking one-time initialisation, called once at startup.
+        """
+
+    async def embed(self, texts: List[str]) -> Optional[Sequence]:
+        """
+        One embedding row per text (a list of lists or a float32 matrix), or None on failure.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class HuggingFaceEmbeddingBackend(EmbeddingBackend):
+    """
+    Fetches sentence embeddings using the Hugging Face Inference API.
+    """
+    name = "huggingface"
+
+    def __init__(self, api_url: str = API_URL, token: Optional[str] = None):
+        self.api_url = api_url
+        # None reads HF_TOKEN from the secret store on every request
+        self.token = token
+        # Shared HTTP client so connections are reused
+        self.http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS)
+
+    def _headers(self) -> Dict[str, str]:
+        token = self.token if self.token is not None else get_secret("HF_TOKEN")
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    async def embed(self, texts: List[str]) -> Optional[List[List[float]]]:
+        try:
+            response = await self.http_client.post(
+                self.api_url,
+                headers=self._headers(),
+                json={"inputs": texts, "options": {"wait_for_model": True}}
+            )
+        except httpx.HTTPError as e:
+            print(f"Error: {e}")
+            return None
+
+        if response.status_code == 200:
+            return response.json()
+        else:
+            print(f"Error: {response.text}")
+            return None
+
+    async def close(self):
+        await self.http_client.aclose()
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    Runs all-MiniLM-L6-v2 on the CPU with onnxruntime. A whole batch of
+    strings goes through a single forward pass, followed by the same mean
+    pooling and L2 normalisation as sentence-transformers.
+    """
+    name = "local"
+
+    def __init__(self, model_dir: str = EMBEDDING_MODEL_DIR, max_tokens: int = EMBEDDING_MAX_TOKENS,
+                 threads: int = EMBEDDING_THREADS):
+        self.model_dir = model_dir
+        self.max_tokens = max_tokens
+        self.threads = threads
+        self.session = None
+        self.tokenizer = None
+        # onnxruntime parallelises inside a forward pass; one caller thread keeps
+        # concurrent requests from oversubscribing the CPU
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embeddings")
+
+    def load(self):
+        if self.session is not None:
+            return
+
+        # Optional dependencies, only needed when this backend is selected
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        tokenizer.enable_truncation(max_length=self.max_tokens)
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        options = onnxruntime.SessionOptions()
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        session = onnxruntime.InferenceSession(
+            os.path.join(self.model_dir, "model.onnx"),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+        self.input_names = {model_input.name for model_input in session.get_inputs()}
+        self.tokenizer = tokenizer
+        self.session = session
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts in one forward pass. Blocking; returns a float32 (n, dim) matrix.
+        """
+        self.load()
+
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real (non-padding) tokens, then L2 normalisation
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    async def embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.encode, texts)
+        except Exception as e:
+            print(f"Local embedding error: {e}")
+            return None
+
+
+BACKENDS = {
+    HuggingFaceEmbeddingBackend.name: HuggingFaceEmbeddingBackend,
+    LocalEmbeddingBackend.name: LocalEmbeddingBackend,
+}
+
+_backend: Optional[EmbeddingBackend] = None
+
+
+def get_backend() -> EmbeddingBackend:
+    """
+    Return the process-wide embedding backend selected by EMBEDDING_BACKEND.
+    """
+    global _backend
+    if _backend is None:
+        if EMBEDDING_BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND {EMBEDDING_BACKEND!r}, expected one of {sorted(BACKENDS)}")
+        _backend = BACKENDS[EMBEDDING_BACKEND]()
+    return _backend
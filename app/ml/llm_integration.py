@@ -1,61 +1,103 @@
 import os
 import json
+import asyncio
 import numpy as np
-import requests
-from typing import Dict, List, Tuple
-from groq import Groq
-from langchain_core.output_parsers import JsonOutputParser
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+from .skill_cache import make_cache_key, skill_cache
+from .embeddings import get_backend as get_embedding_backend
+from .vector_store import get_skill_vector_store, normalize_skill
+from .similarity import best_matches, cosine_similarity_matrix
 
+from ..secret_store import get_secret
 
-from google.cloud import secretmanager
-# Initialize Google Secret Manager client
-def access_secret_version(secret_id: str, project_id="stalwart-star-448320-c8"):
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
+
+# Bump whenever the extraction prompt changes so cached results are not reused
+SKILL_PROMPT_VERSION = "1"
+# Characters of text sent to the skill extraction prompt (0 = no limit).
+# Only the prompt is cut; stored resume text is kept whole.
+SKILL_PROMPT_CHAR_BUDGET = int(os.getenv("SKILL_PROMPT_CHAR_BUDGET", 20000))
+
+# Upper bound on in-flight LLM calls per worker, so a traffic spike queues
+# here instead of tripping Groq rate limits.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+
+
+# groq and langchain are imported on first use; they are only needed on the
+# analysis path and add noticeably to cold starts
+_client: Optional["AsyncGroq"] = None
+_client_api_key: Optional[str] = None
+_output_parser = None
+
+
+class SuggestionsUnavailable(Exception):
+    pass
+
+
+def groq_model() -> str:
     """
-    Fetches a secret from Google Secret Manager.
+    The Groq model to call (env var, secrets file or Secret Manager), looked up
+    on every call so a change applies once the secret store's cache expires.
     """
-    client = secretmanager.SecretManagerServiceClient()
-    name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
-    
-    try:
-        response = client.access_secret_version(name=name)
-        return response.payload.data.decode("UTF-8")
-    except Exception as e:
-        print(f"Error retrieving secret {secret_id}: {e}")
-        return None
-    
-os.environ["GROQ_API_KEY"] = access_secret_version("GROQ_API_KEY") or ""
-os.environ["HF_TOKEN"] = access_secret_version("HF_TOKEN") or ""
+    return get_secret("GROQ_MODEL", "gemma2-9b-it")  # Default model
+
 
-# Set GROQ_MODEL with a default value if not in secrets
-os.environ["GROQ_MODEL"] = access_secret_version("GROQ_MODEL") or "gemma2-9b-it"
+def get_llm_client() -> "AsyncGroq":
+    """
+    Return the shared async Groq client, creating it on first use so the app
+    can start without a key (honours GROQ_BASE_URL, e.g. for a local stub server).
+    The client is replaced when the key in the secret store changes.
+    """
+    global _client, _client_api_key
+    api_key = get_secret("GROQ_API_KEY")
+    # Ensure API key is set
+    if not api_key:
+        raise ValueError("GROQ_API_KEY is not set in the environment variables.")
+    if _client is None or api_key != _client_api_key:
+        from groq import AsyncGroq
+        _client = AsyncGroq(api_key=api_key)
+        _client_api_key = api_key
+    return _client
 
 
-# Load secrets from Google Secret Manager
-GCP_PROJECT_ID = "stalwart-star-448320-c8" 
-# Load Groq API key
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_MODEL = os.getenv("GROQ_MODEL", "gemma2-9b-it")  # Default model
-HF_TOKEN = os.getenv("HF_TOKEN")
+def get_output_parser():
+    global _output_parser
+    if _output_parser is None:
+        from langchain_core.output_parsers import JsonOutputParser
+        _output_parser = JsonOutputParser()
+    return _output_parser
 
 
-# Hugging Face Model ID
-MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
-API_URL = f"https://api-inference.huggingface.co/pipeline/feature-extraction/{MODEL_ID}"
-# Headers
-HEADERS = {"Authorization": f"Bearer {HF_TOKEN}"}
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
 
-output_parser = JsonOutputParser()
+async def extract_skills_from_text(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Extract technical and soft skills from text using LLM (Groq - Gemma).
+    Results are cached by content hash, so repeat texts skip the LLM call.
+    """
+    if SKILL_PROMPT_CHAR_BUDGET:
+        text = text[:SKILL_PROMPT_CHAR_BUDGET]
+    model = groq_model()
+    cache_key = make_cache_key(text, model, SKILL_PROMPT_VERSION)
+    cached = await skill_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    skills = await _request_skills(text, model)
+    if skills is None:
+        return [], []
 
-# Ensure API key is set
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY is not set in the environment variables.")
+    tech_skills, soft_skills = skills
+    await skill_cache.set(cache_key, tech_skills, soft_skills, model, SKILL_PROMPT_VERSION)
+    return tech_skills, soft_skills
 
-# Initialize Groq client
-client = Groq(api_key=GROQ_API_KEY)
 
-def extract_skills_from_text(text: str) -> Tuple[List[str], List[str]]:
+async def _request_skills(text: str, model: str) -> Optional[Tuple[List[str], List[str]]]:
     """
-    Extract technical and soft skills from text using LLM (Groq - Gemma).
+    Ask the LLM for the skills in text. Returns None if the call or parsing fails,
+    so that failures are never cached.
     """
     prompt = f"""
     Extract all technical skills and soft skills from the following text.
@@ -66,16 +108,17 @@ def extract_skills_from_text(text: str) -> Tuple[List[str], List[str]]:
     """
 
     try:
-        completion = client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that extracts skills from text."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            max_tokens=1024,
-            top_p=1,
-        )
+        async with llm_semaphore:
+            completion = await get_llm_client().chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that extracts skills from text."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0,
+                max_tokens=1024,
+                top_p=1,
+            )
 
         # Parse the response
         content = completion.choices[0].message.content
@@ -83,10 +126,10 @@ def extract_skills_from_text(text: str) -> Tuple[List[str], List[str]]:
 
         try:
             # skills_data = json.loads(content)
-            skills_data = output_parser.parse(content)
+            skills_data = get_output_parser().parse(content)
         except json.JSONDecodeError:
             print("Error: LLM response is not valid JSON")
-            return [], []
+            return None
 
         tech_skills = skills_data.get("technical_skills", [])
         soft_skills = skills_data.get("soft_skills", [])
@@ -98,72 +141,85 @@ def extract_skills_from_text(text: str) -> Tuple[List[str], List[str]]:
 
     except Exception as e:
         print(f"Groq API Error: {e}")
-        return [], []
+        return None
 
 
-def get_hf_embeddings(texts):
+async def get_embeddings(texts: List[str]) -> Optional[np.ndarray]:
     """
-    Fetches sentence embeddings using the Hugging Face Inference API.
+    Fetches sentence embeddings for skills as a float32 (len(texts), dim) matrix.
+    Vectors of skills seen before come from the skill vector store; only unseen
+    strings go to the backend.
     """
-    response = requests.post(API_URL, headers=HEADERS, json={"inputs": texts, "options": {"wait_for_model": True}})
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
 
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Error: {response.text}")
-        return None
-    
-def calculate_skill_similarity(resume_skills: List[str], job_skills: List[str]) -> Dict[str, Dict[str, float]]:
+    store = get_skill_vector_store()
+    vectors, missing = store.lookup(texts)
+
+    if missing:
+        embeddings = await get_embedding_backend().embed(missing)
+        if embeddings is None or len(embeddings) != len(missing):
+            return None
+        vectors.update(store.add(missing, embeddings))
+
+    return np.stack([vectors[normalize_skill(text)] for text in texts])
+
+
+async def _known_or_fetch(embeddings, skills: List[str]):
+    if embeddings is not None:
+        return embeddings
+    return await get_embeddings(skills)
+
+
+async def skill_similarity_matrix(resume_skills: List[str], job_skills: List[str],
+                                  resume_embeddings=None, job_embeddings=None) -> Optional[np.ndarray]:
     """
-    Calculate similarity between resume skills and job skills using Hugging Face API embeddings.
+    Cosine similarity of every resume skill (rows) against every job skill (columns).
+    Embeddings that are already known (e.g. stored for a resume) can be passed in and are not fetched again.
     """
-    result = {}
-
     if not resume_skills or not job_skills:
         print("No skills provided for similarity matching.")  # Debugging
-        return result
+        return None
 
-    # Get embeddings from Hugging Face API
-    resume_embeddings = get_hf_embeddings(resume_skills)
-    job_embeddings = get_hf_embeddings(job_skills)
+    # Get missing embeddings from the embedding backend
+    resume_embeddings, job_embeddings = await asyncio.gather(
+        _known_or_fetch(resume_embeddings, resume_skills),
+        _known_or_fetch(job_embeddings, job_skills)
+    )
 
-    if not resume_embeddings or not job_embeddings:
+    if resume_embeddings is None or job_embeddings is None or len(resume_embeddings) == 0 or len(job_embeddings) == 0:
         print("Error: Embeddings could not be retrieved.")
-        return result
-
-    # Convert to NumPy arrays
-    resume_embeddings = np.array(resume_embeddings)
-    job_embeddings = np.array(job_embeddings)
-
-    print(f"Resume Skills Embeddings Shape: {resume_embeddings.shape}")  # Debugging
-    print(f"Job Skills Embeddings Shape: {job_embeddings.shape}")  # Debugging
+        return None
 
-    # Compute cosine similarity
-    for i, resume_skill in enumerate(resume_skills):
-        similarities = np.dot(job_embeddings, resume_embeddings[i]) / (
-            np.linalg.norm(job_embeddings, axis=1) * np.linalg.norm(resume_embeddings[i])
-        )
+    return cosine_similarity_matrix(resume_embeddings, job_embeddings)
 
-        # Find the best match
-        best_match_idx = np.argmax(similarities)
-        best_match_skill = job_skills[best_match_idx]
-        best_match_score = similarities[best_match_idx]
 
-        result[resume_skill] = {
-            "best_match": best_match_skill,
-            "similarity": round(best_match_score, 4)
+async def calculate_skill_similarity(resume_skills: List[str], job_skills: List[str],
+                                     resume_embeddings=None, job_embeddings=None) -> Dict[str, Dict[str, float]]:
+    """
+    Calculate similarity between resume skills and job skills using sentence embeddings.
+    Returns the best job skill match for every resume skill.
+    """
+    similarity = await skill_similarity_matrix(resume_skills, job_skills, resume_embeddings, job_embeddings)
+    if similarity is None:
+        return {}
+
+    best_idx, best_scores = best_matches(similarity)
+    result = {
+        resume_skill: {
+            "best_match": job_skills[best_idx[i]],
+            "similarity": round(float(best_scores[i]), 4)
         }
+        for i, resume_skill in enumerate(resume_skills)
+    }
 
     print("Skill Similarity Results:", result)  # Debugging
     return result
 
 
-def generate_resume_suggestions(resume_text: str, job_description: str,
-                                matched_tech: List[Dict], matched_soft: List[Dict],
-                                missing_tech: List[str], missing_soft: List[str]) -> str:
-    """
-    Generate personalized suggestions to improve the resume for the job.
-    """
+def _suggestions_messages(resume_text: str, job_description: str,
+                          matched_tech: List[Dict], matched_soft: List[Dict],
+                          missing_tech: List[str], missing_soft: List[str]) -> List[Dict]:
     prompt = f"""
     You are a career coach and resume expert. Based on the following information:
     
@@ -184,21 +240,63 @@ def generate_resume_suggestions(resume_text: str, job_description: str,
     
     Be specific, actionable, and constructive in your feedback.
     """
+    return [
+        {"role": "system", "content": "You are a helpful career coach and resume expert."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+async def generate_resume_suggestions(resume_text: str, job_description: str,
+                                matched_tech: List[Dict], matched_soft: List[Dict],
+                                missing_tech: List[str], missing_soft: List[str]) -> str:
+    """
+    Generate personalized suggestions to improve the resume for the job.
+    """
+    messages = _suggestions_messages(resume_text, job_description, matched_tech, matched_soft,
+                                     missing_tech, missing_soft)
 
     try:
-        completion = client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a helpful career coach and resume expert."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000,
-            top_p=1,
-        )
+        async with llm_semaphore:
+            completion = await get_llm_client().chat.completions.create(
+                model=groq_model(),
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1000,
+                top_p=1,
+            )
 
         return completion.choices[0].message.content
 
     except Exception as e:
         print(f"Groq API Error: {e}")
         return "Error: Unable to generate suggestions."
+
+
+async def stream_resume_suggestions(resume_text: str, job_description: str,
+                                    matched_tech: List[Dict], matched_soft: List[Dict],
+                                    missing_tech: List[str], missing_soft: List[str]) -> AsyncIterator[str]:
+    """
+    Same as generate_resume_suggestions, but yields the text as the LLM produces it.
+    Raises SuggestionsUnavailable if the LLM fails, even part way through, so
+    the error is never mistaken for suggestion text.
+    """
+    messages = _suggestions_messages(resume_text, job_description, matched_tech, matched_soft,
+                                     missing_tech, missing_soft)
+
+    try:
+        async with llm_semaphore:
+            stream = await get_llm_client().chat.completions.create(
+                model=groq_model(),
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1000,
+                top_p=1,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    except Exception as e:
+        print(f"Groq API Error: {e}")
+        raise SuggestionsUnavailable("Unable to generate suggestions") from e
@@ -0,0 +1,163 @@
+from typing import List, Literal, Tuple, get_args
+
+import numpy as np
+
+
+def normalize_rows(matrix) -> np.ndarray:
+    """
+    Return matrix as float32 with every row scaled to unit length.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, np.float32(1e-12))
+
+
+def cosine_similarity_matrix(a, b) -> np.ndarray:
+    """
+    Cosine similarity of every row of a against every row of b, shape (len(a), len(b)).
+    Both sides are normalized once and compared with a single matrix multiply.
+    """
+    return normalize_rows(a) @ normalize_rows(b).T
+
+
+def best_matches(similarity: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Index and score of the best column for every row of a similarity matrix.
+    """
+    best_idx = similarity.argmax(axis=1)
+    return best_idx, similarity[np.arange(similarity.shape[0]), best_idx]
+
+
+# How resume skills are paired with job skills:
+#   greedy  - every resume skill claims its best job skill (several may claim the same one)
+#   optimal - one-to-one pairing maximising total similarity (Hungarian algorithm)
+#   sparse  - one-to-one, best pairs first, considering only pairs above the threshold;
+#             much cheaper than optimal on very large lists
+MatchMode = Literal["greedy", "optimal", "sparse"]
+MATCH_MODES = get_args(MatchMode)
+
+
+def greedy_assignment(similarity: np.ndarray, threshold: float) -> List[Tuple[int, int, float]]:
+    """
+    (resume index, job index, score) of each resume skill's best job skill above threshold.
+    """
+    if similarity.size == 0:
+        return []
+    best_idx, best_scores = best_matches(similarity)
+    return [
+        (i, int(best_idx[i]), float(best_scores[i]))
+        for i in range(similarity.shape[0])
+        if best_scores[i] >= threshold
+    ]
+
+
+def _hungarian(cost: np.ndarray) -> np.ndarray:
+    """
+    Minimum-cost assignment for an (n, m) cost matrix with n <= m, using the
+    shortest augmenting path form of the Hungarian algorithm with the inner
+    column scan vectorised. Returns the column assigned to each row.
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of_col = np.zeros(m + 1, dtype=np.int64)  # 1-based row per column, 0 = free
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        row_of_col[0] = i
+        j0 = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = row_of_col[j0]
+            free = ~used[1:]
+
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            improved = free & (reduced < min_reduced[1:])
+            min_reduced[1:][improved] = reduced[improved]
+            way[1:][improved] = j0
+
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+
+            u[row_of_col[used]] += delta
+            v[used] -= delta
+            min_reduced[~used] -= delta
+
+            j0 = j1
+            if row_of_col[j0] == 0:
+                break
+
+        # Augment along the alternating path
+        while j0:
+            j1 = way[j0]
+            row_of_col[j0] = row_of_col[j1]
+            j0 = j1
+
+    col_of_row = np.full(n, -1, dtype=np.int64)
+    for j in range(1, m + 1):
+        if row_of_col[j]:
+            col_of_row[row_of_col[j] - 1] = j - 1
+    return col_of_row
+
+
+def optimal_assignment(similarity: np.ndarray, threshold: float) -> List[Tuple[int, int, float]]:
+    """
+    One-to-one pairs maximising the total similarity of pairs above threshold.
+    Pairs below the threshold are worth nothing, so they never displace a real match.
+    """
+    if similarity.size == 0:
+        return []
+
+    gain = np.where(similarity >= threshold, similarity, 0).astype(np.float64)
+    transposed = gain.shape[0] > gain.shape[1]
+    if transposed:
+        gain = gain.T
+
+    col_of_row = _hungarian(-gain)
+    pairs = []
+    for row, col in enumerate(col_of_row):
+        i, j = (col, row) if transposed else (row, col)
+        if similarity[i, j] >= threshold:
+            pairs.append((int(i), int(j), float(similarity[i, j])))
+    pairs.sort()
+    return pairs
+
+
+def sparse_assignment(similarity: np.ndarray, threshold: float) -> List[Tuple[int, int, float]]:
+    """
+    One-to-one pairs taken best-first from the pairs above threshold only.
+    Cost is dominated by sorting the surviving pairs, not by the matrix size.
+    """
+    rows, cols = np.nonzero(similarity >= threshold)
+    if rows.size == 0:
+        return []
+
+    scores = similarity[rows, cols]
+    order = np.argsort(-scores, kind="stable")
+    used_rows, used_cols = set(), set()
+    pairs = []
+    for k in order:
+        i, j = int(rows[k]), int(cols[k])
+        if i in used_rows or j in used_cols:
+            continue
+        used_rows.add(i)
+        used_cols.add(j)
+        pairs.append((i, j, float(scores[k])))
+    pairs.sort()
+    return pairs
+
+
+def assign_skills(similarity: np.ndarray, threshold: float, mode: str = "greedy") -> List[Tuple[int, int, float]]:
+    """
+    Pair resume skills (rows) with job skills (columns) using the given match mode.
+    """
+    if mode == "greedy":
+        return greedy_assignment(similarity, threshold)
+    if mode == "optimal":
+        return optimal_assignment(similarity, threshold)
+    if mode == "sparse":
+        return sparse_assignment(similarity, threshold)
+    raise ValueError(f"Unknown match mode {mode!r}, expected one of {MATCH_MODES}")
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from .. import models
+from ..database import AsyncSessionLocal
+from ..lru import LRUCache, hit_rate
+
+# Number of extraction results kept in process
+SKILL_CACHE_SIZE = int(os.getenv("SKILL_CACHE_SIZE", 2048))
+# Also keep results in the skill_extractions table so they survive restarts
+# and are shared between instances
+SKILL_CACHE_PERSIST = os.getenv("SKILL_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text so that copies differing only in whitespace share a key.
+    """
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def make_cache_key(text: str, model: str, prompt_version: str) -> str:
+    """
+    Content-addressed key for an extraction: normalized text + model + prompt version.
+    """
+    digest = hashlib.sha256()
+    for part in (model, prompt_version, normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SkillExtractionCache:
+    """
+    Two-tier cache for LLM skill extraction results: a bounded in-process LRU
+    in front of an optional database table.
+    """
+
+    def __init__(self, max_size: int = SKILL_CACHE_SIZE, persist: bool = SKILL_CACHE_PERSIST):
+        self.persist = persist
+        self._entries = LRUCache(max_size)
+        self.persistent_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Tuple[List[str], List[str]]]:
+        value = self._entries.get(key)
+        if value is not None:
+            return list(value[0]), list(value[1])
+
+        if self.persist:
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        select(models.SkillExtraction).where(models.SkillExtraction.cache_key == key)
+                    )
+                    row = result.scalars().first()
+            except Exception as e:
+                print(f"Skill cache lookup failed: {e}")
+                row = None
+            if row is not None:
+                value = (row.technical_skills or [], row.soft_skills or [])
+                self._entries.put(key, value)
+                self.persistent_hits += 1
+                return list(value[0]), list(value[1])
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, technical_skills: List[str], soft_skills: List[str],
+                  model: str, prompt_version: str):
+        self._entries.put(key, (list(technical_skills), list(soft_skills)))
+
+        if self.persist:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.merge(models.SkillExtraction(
+                        cache_key=key,
+                        model=model,
+                        prompt_version=prompt_version,
+                        technical_skills=list(technical_skills),
+                        soft_skills=list(soft_skills)
+                    ))
+                    await db.commit()
+            except Exception as e:
+                print(f"Skill cache write failed: {e}")
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        memory_hits = self._entries.hits
+        return {
+            "size": len(self._entries),
+            "max_size": self._entries.max_size,
+            "persistent": self.persist,
+            "memory_hits": memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": hit_rate(memory_hits + self.persistent_hits, memory_hits + self.persistent_hits + self.misses)
+        }
+
+
+skill_cache = SkillExtractionCache()
@@ -1,42 +1,103 @@
-from typing import Dict, List, Tuple
-from .llm_integration import extract_skills_from_text, calculate_skill_similarity, generate_resume_suggestions
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from .llm_integration import extract_skills_from_text, skill_similarity_matrix, generate_resume_suggestions, get_embeddings
+from .similarity import assign_skills
 
 class SkillMatcher:
     def __init__(self):
         self.similarity_threshold = 0.40  # Minimum similarity to consider a match
     
-    def analyze_resume(self, resume_text: str, job_description: str) -> Dict:
+    async def analyze_resume(self, resume_text: str, job_description: str,
+                             resume_profile: Optional[Dict] = None, match_mode: str = "greedy") -> Dict:
         """
         Main function to analyze a resume against a job description.
+        If a stored resume_profile is given only the job side is extracted.
         """
-        # Extract skills from resume and job description
-        resume_tech, resume_soft = extract_skills_from_text(resume_text)
-        job_tech, job_soft = extract_skills_from_text(job_description)
-        
-        # Calculate skill matches (technical)
-        matched_tech, missing_tech = self._match_skills(resume_tech, job_tech)
-
-        # Calculate skill matches (soft)
-        matched_soft, missing_soft = self._match_skills(resume_soft, job_soft)
+        result = await self.match_resume(resume_text, job_description, resume_profile, match_mode)
 
         # Generate suggestions
-        suggestions = generate_resume_suggestions(
+        result["suggestions"] = await generate_resume_suggestions(
             resume_text, 
             job_description, 
-            matched_tech, 
-            matched_soft, 
-            missing_tech, 
-            missing_soft
+            result["matched_tech_skills"], 
+            result["matched_soft_skills"], 
+            result["missing_tech_skills"], 
+            result["missing_soft_skills"]
+        )
+        return result
+
+    async def match_resume(self, resume_text: str, job_description: str,
+                           resume_profile: Optional[Dict] = None, match_mode: str = "greedy") -> Dict:
+        """
+        Skill matching part of the analysis, everything up to the suggestions.
+        """
+        # The analysis is a small dependency graph: both extractions are
+        # independent, the embeddings need both, the match passes need the
+        # embeddings, and the suggestions need everything.
+        if resume_profile is None:
+            (resume_tech, resume_soft), (job_tech, job_soft) = await asyncio.gather(
+                extract_skills_from_text(resume_text),
+                extract_skills_from_text(job_description)
+            )
+            resume_profile = {
+                "technical_skills": resume_tech,
+                "soft_skills": resume_soft,
+                "technical_embeddings": None,
+                "soft_embeddings": None
+            }
+        else:
+            job_tech, job_soft = await extract_skills_from_text(job_description)
+
+        # Embed every skill that has no vector yet in a single backend call
+        resume_tech_emb, resume_soft_emb, job_tech_emb, job_soft_emb = await self._embed_groups([
+            resume_profile["technical_skills"] if resume_profile.get("technical_embeddings") is None else None,
+            resume_profile["soft_skills"] if resume_profile.get("soft_embeddings") is None else None,
+            job_tech,
+            job_soft
+        ])
+        if resume_profile.get("technical_embeddings") is None:
+            resume_profile["technical_embeddings"] = resume_tech_emb
+        if resume_profile.get("soft_embeddings") is None:
+            resume_profile["soft_embeddings"] = resume_soft_emb
+
+        # Calculate skill matches (technical and soft)
+        (matched_tech, missing_tech), (matched_soft, missing_soft) = await asyncio.gather(
+            self._match_skills(resume_profile["technical_skills"], job_tech,
+                               resume_profile["technical_embeddings"], job_tech_emb, match_mode),
+            self._match_skills(resume_profile["soft_skills"], job_soft,
+                               resume_profile["soft_embeddings"], job_soft_emb, match_mode)
         )
-        
+
         return {
             "matched_tech_skills": matched_tech,
             "matched_soft_skills": matched_soft,
             "missing_tech_skills": missing_tech,
             "missing_soft_skills": missing_soft,
-            "suggestions": suggestions
+            "resume_profile": resume_profile
         }
     
+    async def _embed_groups(self, groups: List[Optional[List[str]]]) -> List[Optional[List]]:
+        """
+        Embed several skill lists with one backend call and split the result back
+        per list. None entries are skipped; a failed call yields None for each list.
+        """
+        texts = [skill for group in groups if group for skill in group]
+        if not texts:
+            return [[] if group is not None else None for group in groups]
+
+        embeddings = await get_embeddings(texts)
+        if embeddings is None or len(embeddings) != len(texts):
+            return [None] * len(groups)
+
+        results, offset = [], 0
+        for group in groups:
+            if group is None:
+                results.append(None)
+                continue
+            results.append(embeddings[offset:offset + len(group)])
+            offset += len(group)
+        return results
+
     # def _match_skills(self, resume_skills: List[str], job_skills: List[str]) -> Tuple[List[Dict], List[str]]:
     #     """
     #     Match skills based on similarity using Hugging Face API.
@@ -72,12 +133,14 @@ class SkillMatcher:
     #     return matched_skills, missing_skills
 
 
-    def _match_skills(self, resume_skills: List[str], job_skills: List[str]) -> Tuple[List[Dict], List[str]]:
+    async def _match_skills(self, resume_skills: List[str], job_skills: List[str],
+                            resume_embeddings=None, job_embeddings=None,
+                            match_mode: str = "greedy") -> Tuple[List[Dict], List[str]]:
         """
-        Match skills based on similarity using Hugging Face API.
+        Match skills based on embedding similarity, pairing them according to
+        match_mode (see ml/similarity.py).
         """
         matched_skills = []
-        missing_skills = job_skills.copy()  # Start with all job skills as missing
 
         print(f"Matching Skills - Resume: {resume_skills}, Job: {job_skills}")  # Debugging
 
@@ -85,25 +148,22 @@ class SkillMatcher:
             print("No skills available for matching. All job skills are considered missing.")
             return matched_skills, job_skills  # All job skills are missing if resume has none
 
-        similarity_results = calculate_skill_similarity(resume_skills, job_skills)
-
-        # Process the similarity results
-        for resume_skill, match_info in similarity_results.items():
-            job_skill = match_info["best_match"]
-            similarity = match_info["similarity"]
-            
-            if similarity >= self.similarity_threshold:
-                matched_skills.append({
-                    "job_skill": job_skill,
-                    "resume_skill": resume_skill,
-                    "similarity": similarity
-                })
-                
-                # Remove from missing skills if it's in there
-                if job_skill in missing_skills:
-                    missing_skills.remove(job_skill)
+        similarity = await skill_similarity_matrix(resume_skills, job_skills, resume_embeddings, job_embeddings)
+        if similarity is None:
+            return matched_skills, list(job_skills)
+
+        matched_jobs = set()
+        for i, j, score in assign_skills(similarity, self.similarity_threshold, match_mode):
+            matched_skills.append({
+                "job_skill": job_skills[j],
+                "resume_skill": resume_skills[i],
+                "similarity": round(score, 4)
+            })
+            matched_jobs.add(j)
+
+        missing_skills = [skill for j, skill in enumerate(job_skills) if j not in matched_jobs]
 
         print("Matched Skills:", matched_skills)  # Debugging
         print("Missing Skills:", missing_skills)  # Debugging
 
-        return matched_skills, missing_skills
\ No newline at end of file
+        return matched_skills, missing_skills
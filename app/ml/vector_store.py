@@ -0,0 +1,216 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..lru import LRUCache, hit_rate
+
+# Where skill vectors are persisted; empty keeps them in memory only
+SKILL_VECTOR_DIR = os.getenv("SKILL_VECTOR_DIR", "vector_store")
+SKILL_VECTOR_LRU_SIZE = int(os.getenv("SKILL_VECTOR_LRU_SIZE", 4096))
+
+INITIAL_CAPACITY = 1024
+
+
+def normalize_skill(skill: str) -> str:
+    """
+    Index key for a skill: case- and whitespace-insensitive.
+    """
+    return " ".join((skill or "").split()).casefold()
+
+
+class SkillVectorStore:
+    """
+    Persistent skill -> embedding store.
+
+    Vectors live as float32 rows of a memory-mapped matrix (vectors.f32); the
+    normalized skill for row i is line i of an append-only key log (keys.jsonl),
+    so the index is rebuilt by reading that file. A small LRU of recently used
+    vectors sits in front of the matrix.
+
+    The files assume a single writer process per directory.
+    """
+
+    def __init__(self, directory: Optional[str] = SKILL_VECTOR_DIR, model: str = "",
+                 lru_size: int = SKILL_VECTOR_LRU_SIZE):
+        self.directory = directory or None
+        self.model = model
+
+        self.dim: Optional[int] = None
+        self.index: Dict[str, int] = {}
+        self.count = 0
+        self.capacity = 0
+        self.matrix: Optional[np.ndarray] = None
+        self._lru = LRUCache(lru_size)
+
+        self.store_hits = 0
+        self.misses = 0
+
+        if self.directory:
+            try:
+                self._load()
+            except Exception as e:
+                print(f"Skill vector store unavailable, keeping vectors in memory: {e}")
+                self.directory = None
+                self._reset()
+
+    # Files
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _reset(self):
+        self.dim = None
+        self.index = {}
+        self.count = 0
+        self.capacity = 0
+        self.matrix = None
+        self._lru.clear()
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path = self._path("meta.json")
+        if not os.path.exists(meta_path):
+            return
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model:
+            # Vectors from another model are not comparable; start over
+            for name in ("meta.json", "keys.jsonl", "vectors.f32"):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            return
+
+        self.dim = meta["dim"]
+        keys = []
+        if os.path.exists(self._path("keys.jsonl")):
+            with open(self._path("keys.jsonl")) as f:
+                keys = [json.loads(line) for line in f if line.strip()]
+
+        vectors_path = self._path("vectors.f32")
+        stored_rows = os.path.getsize(vectors_path) // (4 * self.dim) if os.path.exists(vectors_path) else 0
+        self.capacity = max(INITIAL_CAPACITY, stored_rows)
+        self.matrix = self._map(self.capacity)
+        # Keys are only logged after their rows are flushed, but guard against
+        # a vectors file that was truncated behind our back
+        self.count = min(len(keys), stored_rows)
+        self.index = {key: row for row, key in enumerate(keys[:self.count])}
+
+    def _map(self, capacity: int) -> np.ndarray:
+        if not self.directory:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            if self.matrix is not None:
+                grown[:self.count] = self.matrix[:self.count]
+            return grown
+
+        path = self._path("vectors.f32")
+        size = capacity * self.dim * 4
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, needed: int):
+        if needed <= self.capacity:
+            return
+        capacity = max(INITIAL_CAPACITY, self.capacity)
+        while capacity < needed:
+            capacity *= 2
+        if isinstance(self.matrix, np.memmap):
+            self.matrix.flush()
+        self.matrix = self._map(capacity)
+        self.capacity = capacity
+
+    # Lookups
+
+    def lookup(self, skills: List[str]) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """
+        Split skills into known vectors (by normalized key) and the distinct
+        normalized keys that still need embedding.
+        """
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+        seen = set()
+        for skill in skills:
+            key = normalize_skill(skill)
+            if key in seen:
+                continue
+            seen.add(key)
+            vector = self._lru.get(key)
+            if vector is not None:
+                found[key] = vector
+                continue
+            row = self.index.get(key)
+            if row is not None:
+                vector = np.array(self.matrix[row])
+                self._lru.put(key, vector)
+                self.store_hits += 1
+                found[key] = vector
+                continue
+            self.misses += 1
+            missing.append(key)
+        return found, missing
+
+    def add(self, keys: List[str], vectors) -> Dict[str, np.ndarray]:
+        """
+        Store vectors for normalized keys and return them as float32 rows.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            if self.directory:
+                with open(self._path("meta.json"), "w") as f:
+                    json.dump({"model": self.model, "dim": self.dim}, f)
+
+        added = {}
+        new_keys = [key for key in keys if key not in self.index]
+        self._ensure_capacity(self.count + len(new_keys))
+        for key, vector in zip(keys, vectors):
+            added[key] = vector
+            self._lru.put(key, vector)
+            if key in self.index:
+                continue
+            self.matrix[self.count] = vector
+            self.index[key] = self.count
+            self.count += 1
+
+        if self.directory and new_keys:
+            # Vectors are flushed before their keys are logged, so a crash never
+            # leaves a key pointing at an unwritten row
+            self.matrix.flush()
+            with open(self._path("keys.jsonl"), "a") as f:
+                for key in new_keys:
+                    f.write(json.dumps(key) + "\n")
+        return added
+
+    def stats(self) -> Dict:
+        lru_hits = self._lru.hits
+        row_bytes = 4 * (self.dim or 0)
+        return {
+            "vectors": self.count,
+            "dim": self.dim,
+            "persistent": bool(self.directory),
+            "lru_size": len(self._lru),
+            "lru_hits": lru_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": hit_rate(lru_hits + self.store_hits, lru_hits + self.store_hits + self.misses),
+            "matrix_bytes": self.capacity * row_bytes,
+            "lru_bytes": len(self._lru) * row_bytes
+        }
+
+
+_store: Optional[SkillVectorStore] = None
+
+
+def get_skill_vector_store() -> SkillVectorStore:
+    """
+    Return the process-wide skill vector store for the configured embedding model.
+    """
+    global _store
+    if _store is None:
+        from .embeddings import EMBEDDING_BACKEND, MODEL_ID
+        _store = SkillVectorStore(model=f"{MODEL_ID}:{EMBEDDING_BACKEND}")
+    return _store
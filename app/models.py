@@ -1,8 +1,14 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, Text, JSON, Float
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, Text, JSON, Float, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 import datetime
 from .database import Base
 
+# JSON arrays of skill results: match dicts (job_skill, resume_skill, similarity)
+# in matched_*, skill strings in missing_*. JSONB on Postgres so they can be
+# indexed and queried
+SkillList = JSON().with_variant(JSONB(), "postgresql")
+
 class User(Base):
     __tablename__ = "users"
 
@@ -30,23 +36,80 @@ class Resume(Base):
     
     match_score = Column(Float, nullable=True)
 
+    __table_args__ = (
+        # A user's most recent uploads
+        Index("ix_resumes_user_created_at", user_id, created_at.desc()),
+    )
+
     owner = relationship("User", back_populates="resumes")
     # analyses = relationship("ResumeAnalysis", back_populates="resume")
     analyses = relationship("ResumeAnalysis", back_populates="resume", cascade="all, delete-orphan")
+    skills = relationship("ResumeSkills", back_populates="resume", uselist=False, cascade="all, delete-orphan")
 
 class ResumeAnalysis(Base):
     __tablename__ = "resume_analyses"
 
     id = Column(Integer, primary_key=True, index=True)
     job_description = Column(Text)
-    matched_tech_skills = Column(JSON, nullable=True)
-    matched_soft_skills = Column(JSON, nullable=True)
-    missing_tech_skills = Column(JSON, nullable=True)
-    missing_soft_skills = Column(JSON, nullable=True)
+    matched_tech_skills = Column(SkillList, nullable=True)
+    matched_soft_skills = Column(SkillList, nullable=True)
+    missing_tech_skills = Column(SkillList, nullable=True)
+    missing_soft_skills = Column(SkillList, nullable=True)
     suggestions = Column(Text, nullable=True)
+    # Percentage of the job's skills the resume matched (see resume_analyzer.compute_match_score)
+    match_score = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.datetime.utcnow)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"))
 
     user = relationship("User", back_populates="analyses")
     resume = relationship("Resume", back_populates="analyses")
+
+    __table_args__ = (
+        # Keyset pagination of a user's history, newest first: serves the
+        # filter and order only, the page's columns come from the table
+        Index("ix_resume_analyses_user_created_id", "user_id", "created_at", "id"),
+        # "Has this resume been analyzed" probes and cascading deletes
+        Index("ix_resume_analyses_resume_id", "resume_id"),
+        # "Analyses missing skill X" (@> containment), Postgres only
+        Index("ix_resume_analyses_missing_tech_skills", "missing_tech_skills", postgresql_using="gin",
+              postgresql_ops={"missing_tech_skills": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+        Index("ix_resume_analyses_missing_soft_skills", "missing_soft_skills", postgresql_using="gin",
+              postgresql_ops={"missing_soft_skills": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+    )
+
+class ResumeSkills(Base):
+    __tablename__ = "resume_skills"
+
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True)
+    # sha256 of Resume.content the skills were extracted from; a mismatch means stale
+    content_hash = Column(String(64), nullable=False)
+    technical_skills = Column(JSON, nullable=True)
+    soft_skills = Column(JSON, nullable=True)
+    technical_embeddings = Column(JSON, nullable=True)
+    soft_embeddings = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.datetime.utcnow)
+
+    resume = relationship("Resume", back_populates="skills")
+
+class SkillExtraction(Base):
+    __tablename__ = "skill_extractions"
+
+    # sha256 of normalized text + model + prompt version (see ml/skill_cache.py)
+    cache_key = Column(String(64), primary_key=True)
+    model = Column(String(100))
+    prompt_version = Column(String(20))
+    technical_skills = Column(JSON, nullable=True)
+    soft_skills = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.datetime.utcnow)
+
+class UploadBlob(Base):
+    __tablename__ = "upload_blobs"
+
+    # sha256 of the uploaded bytes; identical uploads share one blob
+    sha256 = Column(String(64), primary_key=True)
+    file_path = Column(String(500), nullable=False)  # Storage key (see storage.py)
+    size = Column(Integer, nullable=False)
+    # Extracted text, reused by later uploads of the same file
+    text = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.datetime.utcnow)
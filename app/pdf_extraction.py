@@ -0,0 +1,116 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, Optional
+
+# Parser processes; 0 parses on the event loop (only useful for debugging)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", 20))
+# Pages after this are ignored; resumes are a few pages long
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 20))
+# Default for callers that only need a prefix of the text: parsing stops once
+# this many characters are extracted (0 = no limit). Resume uploads pass 0, since
+# their text is stored; the skill prompt is capped by SKILL_PROMPT_CHAR_BUDGET.
+PDF_CHAR_BUDGET = int(os.getenv("PDF_CHAR_BUDGET", 20000))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class PDFExtractionTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise PDFExtractionTimeout()
+
+
+def iter_page_text(file_path: str, max_pages: int = PDF_MAX_PAGES) -> Iterator[str]:
+    """
+    Yield the text of each page as it is parsed, in the same layout as
+    pdfminer's extract_text (text boxes separated by blank lines, pages ended by \\f).
+    """
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    for page in extract_pages(file_path, maxpages=max_pages):
+        yield "".join(
+            element.get_text() + "\n" for element in page if isinstance(element, LTTextContainer)
+        ) + "\x0c"
+
+
+def read_pdf_text(file_path: str, max_pages: int = PDF_MAX_PAGES, char_budget: int = PDF_CHAR_BUDGET) -> str:
+    """
+    Text of the leading pages of a PDF, parsing only as many pages as the
+    character budget needs.
+    """
+    parts = []
+    remaining = char_budget
+    for text in iter_page_text(file_path, max_pages):
+        if char_budget and len(text) >= remaining:
+            parts.append(text[:remaining])
+            break
+        parts.append(text)
+        remaining -= len(text)
+    return "".join(parts)
+
+
+def _extract(file_path: str, max_pages: int, char_budget: int, timeout: float) -> str:
+    """
+    Runs inside a pool process. The alarm stops a runaway document from
+    holding on to the worker after the caller has given up on it.
+    """
+    use_alarm = timeout > 0 and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return read_pdf_text(file_path, max_pages, char_budget)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Return the process-wide PDF parser pool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        # forkserver children do not inherit the event loop, DB pool or model threads
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+def shutdown_pdf_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def extract_pdf_text(file_path: str, max_pages: int = PDF_MAX_PAGES, char_budget: int = PDF_CHAR_BUDGET,
+                           timeout: float = PDF_TIMEOUT_SECONDS) -> str:
+    """
+    Extract up to char_budget characters from the first max_pages pages of a
+    PDF without blocking the event loop. Raises PDFExtractionTimeout if
+    parsing takes longer than timeout.
+    """
+    if PDF_WORKERS <= 0:
+        return _extract(file_path, max_pages, char_budget, 0)
+
+    global _pool
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_pdf_pool(), _extract, file_path, max_pages, char_budget, timeout)
+    try:
+        # The worker enforces the timeout itself; the margin covers queueing behind other documents
+        return await asyncio.wait_for(future, timeout * 2 if timeout > 0 else None)
+    except asyncio.TimeoutError:
+        raise PDFExtractionTimeout()
+    except BrokenProcessPool:
+        # A parser process died (e.g. out of memory); start a fresh pool next time
+        _pool = None
+        raise
@@ -0,0 +1,146 @@
+"""
+Startup profiling.
+
+With STARTUP_PROFILE=true the app records when its imports finish, how long
+secrets and the database took, when startup completes and when the first
+request is answered. The report is printed after the first request and
+served at GET /metrics/startup.
+
+For a per-module import breakdown, run a profiled cold start in a fresh
+interpreter:
+
+    python -m app.profiling --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "false").lower() == "true"
+
+
+def process_age() -> Optional[float]:
+    """
+    Seconds since the OS started this process, or None where /proc is not available.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22 (starttime), counted after the parenthesised command name
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupProfile:
+    """
+    Milestones of a cold start, in seconds since the process started, and
+    the durations of the phases in between.
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        # Time spent before this module was imported (interpreter, server)
+        self._offset = process_age() or 0.0
+        self.milestones: Dict[str, float] = {"app_import_started": round(self._offset, 4)}
+        self.durations: Dict[str, float] = {}
+
+    def elapsed(self) -> float:
+        return self._offset + time.perf_counter() - self._started
+
+    def mark(self, name: str):
+        if name not in self.milestones:
+            self.milestones[name] = round(self.elapsed(), 4)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = round(time.perf_counter() - start, 4)
+
+    def report(self) -> Dict:
+        from .secret_store import secret_store
+        durations = dict(self.durations, secrets=round(secret_store.fetch_seconds, 4))
+        return {"milestones": self.milestones, "durations": durations}
+
+
+startup_profile = StartupProfile()
+
+
+# Runs in a fresh interpreter under -X importtime; prints the profile as JSON
+CHILD = r"""
+import asyncio, json, sys
+sys.path.insert(0, sys.argv[1])
+from app.main import app
+from app.profiling import startup_profile
+import httpx
+
+async def main():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://profile") as client:
+            await client.get("/")
+        return startup_profile.report()
+
+print(json.dumps(asyncio.run(main())))
+"""
+
+
+def parse_importtime(lines: List[str]) -> Dict[str, float]:
+    """
+    Self import time in seconds per top-level package, from -X importtime output.
+    """
+    totals: Dict[str, float] = {}
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0.0) + int(self_us) / 1e6
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="packages to list by import time")
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, STARTUP_PROFILE="true", PYTHONUNBUFFERED="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, app_dir],
+        env=env, capture_output=True, text=True
+    )
+    if result.returncode:
+        sys.exit(result.stderr)
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["imports"] = parse_importtime(result.stderr.splitlines())
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("Milestones (since process start)")
+    for name, seconds in report["milestones"].items():
+        print(f"  {name:<24}{seconds * 1000:10.1f} ms")
+    print("Durations")
+    for name, seconds in report["durations"].items():
+        print(f"  {name:<24}{seconds * 1000:10.1f} ms")
+    print(f"Import time by top-level package (top {args.top}, self time summed)")
+    ranked = sorted(report["imports"].items(), key=lambda item: item[1], reverse=True)
+    for package, seconds in ranked[:args.top]:
+        print(f"  {package:<24}{seconds * 1000:10.1f} ms")
+    print(f"  {'total':<24}{sum(report['imports'].values()) * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
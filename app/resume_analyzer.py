@@ -1,56 +1,208 @@
-from typing import Dict, Optional
+import hashlib
+import numpy as np
+from typing import AsyncIterator, Dict, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from .ml.skill_matcher import SkillMatcher
+from .ml.llm_integration import stream_resume_suggestions
+from .database import AsyncSessionLocal
 
 # import models
 from app import models
 
-import json
-from pdfminer.high_level import extract_text
+from .pdf_extraction import extract_pdf_text, PDFExtractionTimeout
+
+SKILL_RESULT_KEYS = ("matched_tech_skills", "matched_soft_skills", "missing_tech_skills", "missing_soft_skills")
+
+
+def _matched_job_skills(matches) -> set:
+    # Greedy matching can pair several resume skills with one job skill
+    return {match.get("job_skill") if isinstance(match, dict) else match for match in matches or []}
+
+
+def compute_match_score(result: Dict) -> Optional[float]:
+    """
+    Percentage of the job's skills (technical and soft) the resume matched,
+    or None if no skills were found in the job description.
+    """
+    job_skills = 0
+    missing = 0
+    for kind in ("tech", "soft"):
+        kind_missing = len(result.get(f"missing_{kind}_skills") or [])
+        job_skills += len(_matched_job_skills(result.get(f"matched_{kind}_skills"))) + kind_missing
+        missing += kind_missing
+    if job_skills == 0:
+        return None
+    return round(100 * (job_skills - missing) / job_skills, 1)
+
 
 class ResumeAnalyzer:
     def __init__(self):
         self.skill_matcher = SkillMatcher()
     
-    def extract_text_from_pdf(self, file_path: str) -> str:
+    async def extract_text_from_pdf(self, file_path: str) -> str:
         """
-        Extract text from PDF file
+        Extract text from PDF file (parsed in the PDF process pool). The whole
+        text is kept: it is stored as Resume.content and reused by every later
+        analysis, and the skill prompt applies its own limit.
         """
         try:
-            return extract_text(file_path)
+            return await extract_pdf_text(file_path, char_budget=0)
+        except PDFExtractionTimeout:
+            raise
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             return ""
     
+    async def load_resume_profile(self, db: Session, resume_id: int, content_hash: str) -> Optional[Dict]:
+        """
+        Return the stored skills and embeddings of a resume, or None if they are
+        missing or were extracted from different content.
+        """
+        result = await db.execute(
+            select(models.ResumeSkills).where(models.ResumeSkills.resume_id == resume_id)
+        )
+        stored = result.scalars().first()
+        if stored is None or stored.content_hash != content_hash:
+            return None
+
+        return {
+            "technical_skills": stored.technical_skills or [],
+            "soft_skills": stored.soft_skills or [],
+            "technical_embeddings": stored.technical_embeddings,
+            "soft_embeddings": stored.soft_embeddings
+        }
+
+    async def save_resume_profile(self, db: Session, resume_id: int, content_hash: str, profile: Dict):
+        """
+        Store a freshly extracted resume profile (committed with the analysis).
+        A profile from a failed extraction is skipped so it is retried next time.
+
+        Written as an upsert: two first analyses of the same resume can run at
+        once, and whichever commits last simply overwrites the other's profile.
+        """
+        complete = (
+            (profile["technical_skills"] or profile["soft_skills"])
+            and (not profile["technical_skills"] or profile["technical_embeddings"] is not None)
+            and (not profile["soft_skills"] or profile["soft_embeddings"] is not None)
+        )
+        if not complete:
+            return
+
+        values = {
+            "content_hash": content_hash,
+            "technical_skills": profile["technical_skills"],
+            "soft_skills": profile["soft_skills"],
+            "technical_embeddings": _to_json(profile["technical_embeddings"]),
+            "soft_embeddings": _to_json(profile["soft_embeddings"])
+        }
+        insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        statement = insert(models.ResumeSkills).values(resume_id=resume_id, **values)
+        await db.execute(statement.on_conflict_do_update(index_elements=["resume_id"], set_=values))
+
     async def analyze_resume(self, resume_text: str, job_description: str, 
                        db: Session, user_id: int, 
-                       resume_id: Optional[int] = None) -> models.ResumeAnalysis:
+                       resume_id: Optional[int] = None,
+                       match_mode: str = "greedy") -> models.ResumeAnalysis:
         """
         Analyze a resume against a job description and save results to DB
         """
+        resume_id = await self._ensure_resume(db, resume_text, user_id, resume_id)
+
+        # Skills of the resume itself are extracted once and stored
+        content_hash = hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest()
+        resume_profile = await self.load_resume_profile(db, resume_id, content_hash)
+
+        # Analyze the resume
+        analysis_result = await self.skill_matcher.analyze_resume(
+            resume_text, job_description, resume_profile, match_mode
+        )
+
+        return await self._save_analysis(
+            db, job_description, user_id, resume_id, content_hash, analysis_result,
+            save_profile=resume_profile is None
+        )
+
+    async def stream_analysis(self, resume_text: str, job_description: str,
+                              user_id: int, resume_id: Optional[int] = None,
+                              match_mode: str = "greedy") -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Analyze a resume like analyze_resume, yielding (event, data) pairs as
+        results become available: the skill matches first, then the suggestion
+        text chunk by chunk. The analysis is saved once the suggestions finish;
+        if they fail (SuggestionsUnavailable) it is not saved at all.
+
+        Uses its own short-lived sessions, so no connection is held while
+        waiting on the LLM and it can outlive the request's session.
+        """
+        yield "status", {"stage": "matching"}
+
+        content_hash = hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest()
+        async with AsyncSessionLocal() as db:
+            resume_id = await self._ensure_resume(db, resume_text, user_id, resume_id)
+            resume_profile = await self.load_resume_profile(db, resume_id, content_hash)
+
+        analysis_result = await self.skill_matcher.match_resume(
+            resume_text, job_description, resume_profile, match_mode
+        )
+        yield "skills", {key: analysis_result[key] for key in SKILL_RESULT_KEYS}
+
+        parts = []
+        async for text in stream_resume_suggestions(
+            resume_text,
+            job_description,
+            *(analysis_result[key] for key in SKILL_RESULT_KEYS)
+        ):
+            parts.append(text)
+            yield "suggestion", {"text": text}
+        analysis_result["suggestions"] = "".join(parts)
+
+        async with AsyncSessionLocal() as db:
+            analysis = await self._save_analysis(
+                db, job_description, user_id, resume_id, content_hash, analysis_result,
+                save_profile=resume_profile is None
+            )
+        yield "done", {"id": analysis.id, "resume_id": resume_id}
+
+    async def _ensure_resume(self, db: Session, resume_text: str, user_id: int,
+                             resume_id: Optional[int]) -> int:
         # If resume_id is not provided, create a new resume
         if resume_id is None:
             resume = models.Resume(
                 name="Uploaded Resume",
                 content=resume_text,
+                filename="pasted-resume.txt",  # filename is NOT NULL
                 user_id=user_id
             )
             db.add(resume)
             await db.commit()
             await db.refresh(resume)
             resume_id = resume.id
-        
-        # Analyze the resume
-        analysis_result = self.skill_matcher.analyze_resume(resume_text, job_description)
-        
+        return resume_id
+
+    async def _save_analysis(self, db: Session, job_description: str, user_id: int, resume_id: int,
+                             content_hash: str, analysis_result: Dict,
+                             save_profile: bool) -> models.ResumeAnalysis:
+        if save_profile:
+            await self.save_resume_profile(db, resume_id, content_hash, analysis_result["resume_profile"])
+
+        match_score = compute_match_score(analysis_result)
+        # The resume shows the score of its latest analysis
+        await db.execute(
+            update(models.Resume).where(models.Resume.id == resume_id).values(match_score=match_score)
+        )
+
         # Create a new analysis record
         analysis = models.ResumeAnalysis(
             job_description=job_description,
-            matched_tech_skills=json.dumps(analysis_result["matched_tech_skills"]),
-            matched_soft_skills=json.dumps(analysis_result["matched_soft_skills"]),
-            missing_tech_skills=json.dumps(analysis_result["missing_tech_skills"]),
-            missing_soft_skills=json.dumps(analysis_result["missing_soft_skills"]),
+            matched_tech_skills=analysis_result["matched_tech_skills"],
+            matched_soft_skills=analysis_result["matched_soft_skills"],
+            missing_tech_skills=analysis_result["missing_tech_skills"],
+            missing_soft_skills=analysis_result["missing_soft_skills"],
             suggestions=analysis_result["suggestions"],
+            match_score=match_score,
             user_id=user_id,
             resume_id=resume_id
         )
@@ -59,4 +211,9 @@ class ResumeAnalyzer:
         await db.commit()
         await db.refresh(analysis)
         
-        return analysis
\ No newline at end of file
+        return analysis
+
+
+def _to_json(embeddings):
+    # Embedding matrices are stored as plain nested lists in the JSON column
+    return np.asarray(embeddings).tolist() if embeddings is not None else None
@@ -27,7 +27,7 @@ async def login_for_access_token(
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token_expires = timedelta(minutes=auth.access_token_expire_minutes())
     access_token = auth.create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends
+from .. import auth
+from ..database import get_pool_stats
+from ..ml.skill_cache import skill_cache
+from ..ml.vector_store import get_skill_vector_store
+from ..analysis_jobs import analysis_queue
+from ..profiling import startup_profile
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/cache")
+async def get_cache_metrics(current_user = Depends(auth.get_current_active_user)):
+    """
+    Hit/miss counters for the in-process caches, used to size them
+    """
+    return {
+        "skill_extraction": skill_cache.stats(),
+        "skill_vectors": get_skill_vector_store().stats(),
+        "auth": auth.auth_cache.stats()
+    }
+
+
+@router.get("/jobs")
+async def get_job_metrics(current_user = Depends(auth.get_current_active_user)):
+    """
+    Worker count, queue depth and job counts by status for the analysis queue
+    """
+    return analysis_queue.stats()
+
+
+@router.get("/db")
+async def get_db_metrics(current_user = Depends(auth.get_current_active_user)):
+    """
+    Connection pool usage and checkout wait times
+    """
+    return get_pool_stats()
+
+
+@router.get("/startup")
+async def get_startup_metrics(current_user = Depends(auth.get_current_active_user)):
+    """
+    Cold start milestones and phase durations for this instance
+    """
+    return startup_profile.report()
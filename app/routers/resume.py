@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
+import base64
+import hashlib
 import os
-import uuid
+import mimetypes
+from urllib.parse import quote
 
-from sqlalchemy import select
+from sqlalchemy import select, tuple_, literal, or_, exists, func, cast, true
+from sqlalchemy.dialects.postgresql import JSONB
 from .. import models, auth
 from ..database import get_db
 from ..models import User
 from ..resume_analyzer import ResumeAnalyzer
+from ..analysis_jobs import analysis_queue, QueueFullError
+from ..pdf_extraction import PDFExtractionTimeout
+from ..uploads import save_upload, read_upload_text, dedupe_upload, UploadTooLarge
+from ..storage import get_storage, ObjectNotFound
+from ..ml.similarity import MatchMode
+from ..ml.llm_integration import SuggestionsUnavailable
 from pydantic import BaseModel
 import json
 
@@ -49,13 +61,34 @@ class AnalysisResult(BaseModel):
     class Config:
         orm_mode = True
 
+class AnalysisHistoryItem(BaseModel):
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    resume_id: Optional[int] = None
+    job_description: Optional[str] = None
+    matched_tech_skills: Optional[List] = None
+    matched_soft_skills: Optional[List] = None
+    missing_tech_skills: Optional[List] = None
+    missing_soft_skills: Optional[List] = None
+    suggestions: Optional[str] = None
+
+class AnalysisJobStatus(BaseModel):
+    job_id: str
+    status: str
+    analysis_id: Optional[int] = None
+    error: Optional[str] = None
+    result: Optional[AnalysisResult] = None
+
+def load_skill_list(value) -> List:
+    # Skill columns hold native JSON lists; rows written before
+    # app.migrations ran may still hold them JSON-encoded as a string
+    if value is None:
+        return []
+    return json.loads(value) if isinstance(value, str) else value
+
 # Initialize resume analyzer
 resume_analyzer = ResumeAnalyzer()
 
-# Create upload directory if it doesn't exist
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 @router.post("/upload", response_model=Resume)
 async def upload_resume(
     name: str = Form(...),
@@ -71,21 +104,29 @@ async def upload_resume(
     file_path = None
     
     if file:
-        # Save the uploaded file
+        # Stream the uploaded file to a staging file; text files are decoded on the way
+        storage = get_storage()
         file_extension = os.path.splitext(file.filename)[1]
-        file_name = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(UPLOAD_DIR, file_name)
-        
-        with open(file_path, "wb") as buffer:
-            buffer.write(await file.read())
-        
-        # Extract text if it's a PDF
-        if file_extension.lower() == ".pdf":
-            content = resume_analyzer.extract_text_from_pdf(file_path)
-        else:
-            # For text files
-            with open(file_path, "r") as f:
-                content = f.read()
+        is_pdf = file_extension.lower() == ".pdf"
+        try:
+            stored = await save_upload(file, storage.staging_dir(), decode_text=not is_pdf)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Text files must be UTF-8 encoded")
+
+        # Identical files are stored once and their text is extracted once
+        try:
+            blob, _ = await dedupe_upload(
+                db,
+                stored,
+                storage,
+                extract_text=resume_analyzer.extract_text_from_pdf if is_pdf else None
+            )
+        except PDFExtractionTimeout:
+            raise HTTPException(status_code=422, detail="PDF took too long to parse")
+        file_path = blob.file_path
+        content = blob.text or ""
     else:
         content = text_content
     
@@ -94,6 +135,7 @@ async def upload_resume(
         name=name,
         content=content,
         file_path=file_path,
+        filename=file.filename if file else "pasted-resume.txt",
         user_id=current_user.id
     )
     
@@ -107,6 +149,7 @@ async def upload_resume(
 async def analyze_resume(
     resume_id: int,
     job_description: str = Form(...),
+    match_mode: MatchMode = Form("greedy"),
     current_user = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -129,16 +172,17 @@ async def analyze_resume(
         job_description,
         db,
         current_user.id,
-        resume_id
+        resume_id,
+        match_mode=match_mode
     )
     
     # Parse JSON fields
     result = {
         "id": analysis.id,
-        "matched_tech_skills": json.loads(analysis.matched_tech_skills),
-        "matched_soft_skills": json.loads(analysis.matched_soft_skills),
-        "missing_tech_skills": json.loads(analysis.missing_tech_skills),
-        "missing_soft_skills": json.loads(analysis.missing_soft_skills),
+        "matched_tech_skills": load_skill_list(analysis.matched_tech_skills),
+        "matched_soft_skills": load_skill_list(analysis.matched_soft_skills),
+        "missing_tech_skills": load_skill_list(analysis.missing_tech_skills),
+        "missing_soft_skills": load_skill_list(analysis.missing_soft_skills),
         "suggestions": analysis.suggestions
     }
     
@@ -149,61 +193,287 @@ async def analyze_resume_text(
     job_description: str = Form(...),
     resume_file: Optional[UploadFile] = File(None),
     resume_text: Optional[str] = Form(None),
+    match_mode: MatchMode = Form("greedy"),
     current_user=Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
     # Extract resume text from file if provided
     if resume_file:
         try:
-            content = await resume_file.read()
-            resume_text = content.decode("utf-8")  # Ensure proper decoding
+            resume_text = (await read_upload_text(resume_file)).text
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Text files must be UTF-8 encoded")
         except Exception as e:
-            return {"error": f"Error reading file: {str(e)}"}
+            raise HTTPException(status_code=400, detail=f"Error reading file: {str(e)}")
 
     if not resume_text:
-        return {"error": "No resume text provided"}
+        raise HTTPException(status_code=400, detail="No resume text provided")
 
     # Analyze the resume text
     analysis = await resume_analyzer.analyze_resume(
         resume_text,
         job_description,
         db,
-        current_user.id
+        current_user.id,
+        match_mode=match_mode
     )
 
     # Parse JSON fields safely
     result = {
         "id": analysis.id,
-        "matched_tech_skills": json.loads(analysis.matched_tech_skills or "[]"),
-        "matched_soft_skills": json.loads(analysis.matched_soft_skills or "[]"),
-        "missing_tech_skills": json.loads(analysis.missing_tech_skills or "[]"),
-        "missing_soft_skills": json.loads(analysis.missing_soft_skills or "[]"),
+        "matched_tech_skills": load_skill_list(analysis.matched_tech_skills),
+        "matched_soft_skills": load_skill_list(analysis.matched_soft_skills),
+        "missing_tech_skills": load_skill_list(analysis.missing_tech_skills),
+        "missing_soft_skills": load_skill_list(analysis.missing_soft_skills),
         "suggestions": analysis.suggestions
     }
 
     return result
 
-@router.get("/history", response_model=List[AnalysisResult])
-def get_analysis_history(
+def _sse_response(events):
+    """
+    Wrap an async iterator of (event, data) pairs as a Server-Sent Events response.
+    """
+    async def body():
+        try:
+            async for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except SuggestionsUnavailable as e:
+            logger.exception("Streaming analysis failed")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        except Exception:
+            # Details (which can include SQL and parameters) stay in the server log
+            logger.exception("Streaming analysis failed")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Analysis failed'})}\n\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/analyze/{resume_id}/stream")
+async def analyze_resume_stream(
+    resume_id: int,
+    job_description: str = Form(...),
+    match_mode: MatchMode = Form("greedy"),
+    current_user = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming variant of /analyze/{resume_id}: sends the skill matches as soon
+    as they are computed, then the suggestions token by token (SSE).
+    """
+    result = await db.execute(
+        select(models.Resume).where(
+            models.Resume.id == resume_id,
+            models.Resume.user_id == current_user.id
+        )
+    )
+    resume = result.scalars().first()
+
+    if resume is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    return _sse_response(resume_analyzer.stream_analysis(
+        resume.content,
+        job_description,
+        current_user.id,
+        resume_id,
+        match_mode=match_mode
+    ))
+
+@router.post("/analyze-stream")
+async def analyze_pasted_resume_stream(
+    resumeText: str = Form(...),
+    job_description: str = Form(...),
+    match_mode: MatchMode = Form("greedy"),
+    current_user = Depends(auth.get_current_active_user)
+):
+    """
+    Streaming variant of /analyze for pasted resume text (SSE).
+    """
+    return _sse_response(resume_analyzer.stream_analysis(
+        resumeText,
+        job_description,
+        current_user.id,
+        match_mode=match_mode
+    ))
+
+@router.post("/jobs", response_model=AnalysisJobStatus, status_code=202)
+async def submit_analysis_job(
+    job_description: str = Form(...),
+    resume_id: Optional[int] = Form(None),
+    resume_text: Optional[str] = Form(None),
+    match_mode: MatchMode = Form("greedy"),
+    current_user = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue an analysis of a stored resume (resume_id) or pasted text and return
+    its job id straight away. Poll GET /resume/jobs/{job_id} for the result.
+    """
+    if resume_id is not None:
+        result = await db.execute(
+            select(models.Resume).where(
+                models.Resume.id == resume_id,
+                models.Resume.user_id == current_user.id
+            )
+        )
+        resume = result.scalars().first()
+        if resume is None:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        resume_text = resume.content
+
+    if not resume_text:
+        raise HTTPException(status_code=400, detail="Either resume_id or resume_text must be provided")
+
+    try:
+        job = analysis_queue.submit(
+            current_user.id,
+            resume_text,
+            job_description,
+            resume_id,
+            match_mode=match_mode
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"job_id": job.id, "status": job.status}
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobStatus)
+async def get_analysis_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for the job to finish"),
     current_user = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    analyses = db.query(models.ResumeAnalysis).filter(
+    """
+    Status of a queued analysis, with the analysis itself once it has completed.
+    """
+    job = analysis_queue.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if wait and not job.done.is_set():
+        await analysis_queue.wait(job, wait)
+
+    response = {
+        "job_id": job.id,
+        "status": job.status,
+        "analysis_id": job.analysis_id,
+        "error": job.error
+    }
+    if job.analysis_id is not None:
+        analysis = await db.get(models.ResumeAnalysis, job.analysis_id)
+        if analysis is not None:
+            response["result"] = {
+                "id": analysis.id,
+                "matched_tech_skills": load_skill_list(analysis.matched_tech_skills),
+                "matched_soft_skills": load_skill_list(analysis.matched_soft_skills),
+                "missing_tech_skills": load_skill_list(analysis.missing_tech_skills),
+                "missing_soft_skills": load_skill_list(analysis.missing_soft_skills),
+                "suggestions": analysis.suggestions
+            }
+    return response
+
+# Columns GET /history can return; id and created_at are always loaded for the cursor
+HISTORY_FIELDS = {
+    "id": models.ResumeAnalysis.id,
+    "created_at": models.ResumeAnalysis.created_at,
+    "resume_id": models.ResumeAnalysis.resume_id,
+    "job_description": models.ResumeAnalysis.job_description,
+    "matched_tech_skills": models.ResumeAnalysis.matched_tech_skills,
+    "matched_soft_skills": models.ResumeAnalysis.matched_soft_skills,
+    "missing_tech_skills": models.ResumeAnalysis.missing_tech_skills,
+    "missing_soft_skills": models.ResumeAnalysis.missing_soft_skills,
+    "suggestions": models.ResumeAnalysis.suggestions,
+}
+HISTORY_DEFAULT_FIELDS = [field for field in HISTORY_FIELDS if field != "job_description"]
+HISTORY_SKILL_FIELDS = {"matched_tech_skills", "matched_soft_skills", "missing_tech_skills", "missing_soft_skills"}
+
+
+def missing_skill_clause(dialect_name: str, skill: str):
+    """
+    Analyses whose missing tech or soft skills include skill (exact match).
+    On Postgres this is a JSONB containment test served by the GIN indexes.
+    """
+    columns = (models.ResumeAnalysis.missing_tech_skills, models.ResumeAnalysis.missing_soft_skills)
+    if dialect_name == "postgresql":
+        # The cast lets this run on columns app.migrations has not converted
+        # from json yet (unindexed until then); on jsonb columns it is a no-op
+        return or_(*[cast(column, JSONB).contains([skill]) for column in columns])
+    # Elsewhere (SQLite in development) search the array elements
+    clauses = []
+    for column in columns:
+        elements = func.json_each(column).table_valued("value")
+        clauses.append(exists().where(elements.c.value == skill))
+    return or_(*clauses)
+
+
+def encode_history_cursor(created_at: datetime, analysis_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{analysis_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_history_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, analysis_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(analysis_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/history", response_model=List[AnalysisHistoryItem], response_model_exclude_unset=True)
+async def get_analysis_history(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    missing_skill: Optional[str] = Query(None, description="Only analyses missing this skill"),
+    current_user = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    The user's analyses, newest first, one page at a time. Pages are keyed on
+    (created_at, id), so every page costs the same however deep it is; the
+    cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    requested = [f.strip() for f in fields.split(",") if f.strip()] if fields else HISTORY_DEFAULT_FIELDS
+    unknown = [f for f in requested if f not in HISTORY_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    columns = list(dict.fromkeys(["id", "created_at", *requested]))
+
+    query = select(*[HISTORY_FIELDS[f] for f in columns]).where(
         models.ResumeAnalysis.user_id == current_user.id
-    ).all()
-    
-    results = []
-    for analysis in analyses:
-        results.append({
-            "id": analysis.id,
-            "matched_tech_skills": json.loads(analysis.matched_tech_skills),
-            "matched_soft_skills": json.loads(analysis.matched_soft_skills),
-            "missing_tech_skills": json.loads(analysis.missing_tech_skills),
-            "missing_soft_skills": json.loads(analysis.missing_soft_skills),
-            "suggestions": analysis.suggestions
-        })
-    
-    return results
+    )
+    if missing_skill:
+        query = query.where(missing_skill_clause(db.bind.dialect.name, missing_skill))
+    if cursor:
+        created_at, analysis_id = decode_history_cursor(cursor)
+        query = query.where(
+            tuple_(models.ResumeAnalysis.created_at, models.ResumeAnalysis.id) < tuple_(
+                literal(created_at, models.ResumeAnalysis.created_at.type), literal(analysis_id)
+            )
+        )
+    # One extra row tells whether there is another page
+    query = query.order_by(
+        models.ResumeAnalysis.created_at.desc(), models.ResumeAnalysis.id.desc()
+    ).limit(limit + 1)
+
+    rows = (await db.execute(query)).mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_history_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+    return [
+        {f: load_skill_list(row[f]) if f in HISTORY_SKILL_FIELDS else row[f] for f in requested}
+        for row in rows
+    ]
 
 
 
@@ -214,7 +484,6 @@ from app.auth import get_current_user
 
 # backend/app/routers/resume.py
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 
 @router.get("/recent")
 async def get_recent_resumes(
@@ -226,150 +495,290 @@ async def get_recent_resumes(
     Get the most recent resume uploads for the current user
     """
     try:
-        
-
-        # Make sure we're using the correct async pattern
-        stmt = select(models.Resume).where(
+        # Status comes from an EXISTS probe in the same query, not a per-resume load
+        analyzed = exists().where(models.ResumeAnalysis.resume_id == models.Resume.id)
+        stmt = select(
+            models.Resume.id,
+            models.Resume.filename,
+            models.Resume.created_at,
+            analyzed.label("analyzed")
+        ).where(
             models.Resume.user_id == current_user.id
         ).order_by(models.Resume.created_at.desc()).limit(limit)
-        
-        result = await db.execute(stmt)
-        recent_resumes = result.scalars().all()
-
-        query = text("""
-            SELECT id, filename, created_at
-            FROM resumes 
-            WHERE user_id = :user_id 
-            ORDER BY created_at DESC 
-            LIMIT :limit
-        """)
-
-
-        result = await db.execute(query, {"user_id": current_user.id, "limit": limit})
-        recent_resumes = result.mappings().all()
-
-        
-        result = []
-        for resume in recent_resumes:
-            result.append({
-                "id": resume.id,
-                "filename": resume.filename,
-                "created_at": resume.created_at,
-                "status": "analyzed" if hasattr(resume, "analyses") and resume.analyses else "uploaded"
-            })
-        
-        return result
+
+        rows = (await db.execute(stmt)).all()
+        return [
+            {
+                "id": row.id,
+                "filename": row.filename,
+                "created_at": row.created_at,
+                "status": "analyzed" if row.analyzed else "uploaded"
+            }
+            for row in rows
+        ]
     except Exception as e:
         print('Recent Error')
         print(e)
         raise HTTPException(status_code=500, detail=f"Failed to retrieve recent resumes: {str(e)}")
     
 
+# Top missing skills are counted over this many of the user's latest analyses,
+# so the dashboard costs the same however long the history is
+STATS_SKILL_WINDOW = int(os.getenv("STATS_SKILL_WINDOW", 500))
+
+
+def top_missing_skills_query(dialect_name: str, user_id: int, column_name: str, limit: int):
+    """
+    (skill, count) rows for the skills most often listed in column_name
+    across the user's recent analyses, most frequent first.
+    """
+    column = getattr(models.ResumeAnalysis, column_name)
+    postgres = dialect_name == "postgresql"
+    if postgres:
+        # The cast lets this run on columns app.migrations has not converted
+        # from json yet; on jsonb columns it is a no-op
+        skills, json_type = cast(column, JSONB), func.jsonb_typeof
+    else:
+        skills, json_type = column, func.json_type
+    # Double-encoded rows not yet rewritten by app.migrations hold strings, not arrays
+    recent = select(skills.label("skills")).where(
+        models.ResumeAnalysis.user_id == user_id,
+        json_type(skills) == "array"
+    ).order_by(
+        models.ResumeAnalysis.created_at.desc(), models.ResumeAnalysis.id.desc()
+    ).limit(STATS_SKILL_WINDOW).subquery()
+
+    if postgres:
+        elements = func.jsonb_array_elements_text(recent.c.skills).table_valued("value")
+    else:
+        elements = func.json_each(recent.c.skills).table_valued("value")
+    count = func.count().label("count")
+    return select(elements.c.value.label("skill"), count).select_from(recent).join(elements, true()).group_by(
+        elements.c.value
+    ).order_by(count.desc(), elements.c.value).limit(limit)
+
+
+async def top_missing_skills(db, user_id: int, column_name: str, limit: int) -> List[dict]:
+    query = top_missing_skills_query(db.bind.dialect.name, user_id, column_name, limit)
+    return [dict(row) for row in (await db.execute(query)).mappings().all()]
+
+
 @router.get("/stats")
-async def get_resume_stats(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_resume_stats(
+    top: int = Query(5, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """
-    Get statistics about resume analyses for the current user's dashboard
+    Get statistics about resume analyses for the current user's dashboard,
+    aggregated in the database
     """
     try:
-        # Get all resume analyses for the current user
-        # For async SQLAlchemy
-        
-        
-        from sqlalchemy import text
-
-        # Get all resume analyses for the current user (only fetch once)
-        result = await db.execute(
-            text("SELECT * FROM resumes WHERE user_id = :user_id"),
-            {"user_id": current_user.id}
-        )
-        user_resumes = result.fetchall()
-
-        
-        # Calculate statistics
-        total_resumes = len(user_resumes)
-        
-        # If there are no resumes, return empty stats
-        if total_resumes == 0:
-            return {
-                "total_resumes": 0,
-                "latest_analysis": None,
-                "average_match_score": 0,
-                "skill_gaps": [],
-                "improvement_areas": []
-            }
-        
-        # Get the latest analysis
-        latest_resume = max(user_resumes, key=lambda x: x.created_at)
-        latest_analysis = {
-            "id": latest_resume.id,
-            "filename": latest_resume.filename,
-            "created_at": latest_resume.created_at,
-            "match_score": latest_resume.match_score if hasattr(latest_resume, "match_score") else 0
-        }
-        
-        # Calculate average match score if applicable
-        resumes_with_scores = [r for r in user_resumes if hasattr(r, "match_score") and r.match_score is not None]
-        average_match_score = sum(r.match_score for r in resumes_with_scores) / len(resumes_with_scores) if resumes_with_scores else 0
-        
-        # Get common skill gaps and improvement areas
-        # This would ideally be calculated from analysis results stored in the database
-        # For now, we'll return placeholder data
-        skill_gaps = ["Python", "React", "FastAPI"] if total_resumes > 0 else []
-        improvement_areas = ["Resume Structure", "Skills Section", "Experience Details"] if total_resumes > 0 else []
-        
+        resume_count = select(func.count()).select_from(models.Resume).where(
+            models.Resume.user_id == current_user.id
+        ).scalar_subquery()
+        totals = (await db.execute(
+            select(
+                resume_count.label("total_resumes"),
+                func.count(models.ResumeAnalysis.id).label("total_analyses"),
+                func.avg(models.ResumeAnalysis.match_score).label("average_match_score")
+            ).where(models.ResumeAnalysis.user_id == current_user.id)
+        )).mappings().one()
+
+        latest = (await db.execute(
+            select(
+                models.ResumeAnalysis.id,
+                models.ResumeAnalysis.resume_id,
+                models.Resume.filename,
+                models.ResumeAnalysis.created_at,
+                models.ResumeAnalysis.match_score
+            ).outerjoin(
+                models.Resume, models.Resume.id == models.ResumeAnalysis.resume_id
+            ).where(
+                models.ResumeAnalysis.user_id == current_user.id
+            ).order_by(
+                models.ResumeAnalysis.created_at.desc(), models.ResumeAnalysis.id.desc()
+            ).limit(1)
+        )).mappings().first()
+
+        missing_tech = await top_missing_skills(db, current_user.id, "missing_tech_skills", top)
+        missing_soft = await top_missing_skills(db, current_user.id, "missing_soft_skills", top)
+
+        average = totals["average_match_score"]
         return {
-            "total_resumes": total_resumes,
-            "latest_analysis": latest_analysis,
-            "average_match_score": average_match_score,
-            "skill_gaps": skill_gaps,
-            "improvement_areas": improvement_areas
+            "total_resumes": totals["total_resumes"],
+            "total_analyses": totals["total_analyses"],
+            "latest_analysis": dict(latest) if latest else None,
+            "average_match_score": round(average, 1) if average is not None else 0,
+            "skill_gaps": [row["skill"] for row in missing_tech],
+            "improvement_areas": [row["skill"] for row in missing_soft],
+            "missing_skill_counts": {"technical": missing_tech, "soft": missing_soft}
         }
     except Exception as e:
         print('Stats Error')
         print(e)
         raise HTTPException(status_code=500, detail=f"Failed to retrieve dashboard stats: {str(e)}")
 
-# backend/app/routers/resume.py
-from app.models import ResumeAnalysis
+def _parse_range(header: str, size: int):
+    """
+    (start, end) of a single "bytes=" range, inclusive, or None if it cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last n bytes
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        return None
+    return start, end
+
+@router.get("/{resume_id}/file")
+async def download_resume_file(
+    resume_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user = Depends(auth.get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream the originally uploaded file. Supports single byte-range requests.
+    """
+    result = await db.execute(
+        select(models.Resume.file_path, models.Resume.filename).where(
+            models.Resume.id == resume_id,
+            models.Resume.user_id == current_user.id
+        )
+    )
+    row = result.first()
+    if row is None or not row.file_path:
+        raise HTTPException(status_code=404, detail="Resume file not found")
+
+    storage = get_storage()
+    try:
+        size = await storage.size(row.file_path)
+    except ObjectNotFound:
+        raise HTTPException(status_code=404, detail="Resume file not found")
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(row.filename or 'resume')}"
+    }
+    media_type = mimetypes.guess_type(row.filename or "")[0] or "application/octet-stream"
+    status_code = 200
+    start, end = 0, size - 1
+
+    if range_header:
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            raise HTTPException(status_code=416, detail="Invalid range", headers={"Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        storage.stream(row.file_path, start, end) if size else iter(()),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
+
+def resume_etag(resume_id: int, updated_at: Optional[datetime], analysis_id: Optional[int]) -> str:
+    """
+    Weak ETag for a resume's details: it changes when the resume is updated
+    or a newer analysis is saved (analyses are never edited in place).
+    """
+    version = f"{resume_id}:{updated_at.isoformat() if updated_at else ''}:{analysis_id or 0}"
+    return 'W/"' + hashlib.sha1(version.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches etag (weak comparison).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
 
 @router.get("/{resume_id}")
 async def get_resume_details(
     resume_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Get detailed information about a specific resume
+    Get detailed information about a specific resume and its latest analysis.
+    Send the returned ETag back as If-None-Match to get a 304 if nothing changed.
     """
-    resume = db.query(Resume).filter(
-        Resume.id == resume_id,
-        Resume.user_id == current_user.id
-    ).first()
-    
-    if not resume:
+    # The latest analysis is picked by a correlated subquery in the join
+    # condition, so the resume and its analysis come back in one round trip
+    latest_analysis_id = select(models.ResumeAnalysis.id).where(
+        models.ResumeAnalysis.resume_id == models.Resume.id
+    ).order_by(
+        models.ResumeAnalysis.created_at.desc(), models.ResumeAnalysis.id.desc()
+    ).limit(1).correlate(models.Resume).scalar_subquery()
+
+    result = await db.execute(
+        select(
+            models.Resume.id,
+            models.Resume.filename,
+            models.Resume.file_path,
+            models.Resume.created_at,
+            models.Resume.updated_at,
+            models.ResumeAnalysis
+        ).outerjoin(
+            models.ResumeAnalysis, models.ResumeAnalysis.id == latest_analysis_id
+        ).where(
+            models.Resume.id == resume_id,
+            models.Resume.user_id == current_user.id
+        )
+    )
+    row = result.first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Resume not found")
-    
-    # Get the latest analysis if it exists
-    analysis = db.query(ResumeAnalysis).filter(
-        ResumeAnalysis.resume_id == resume.id
-    ).order_by(ResumeAnalysis.created_at.desc()).first()
-    
+
+    analysis = row.ResumeAnalysis
+    etag = resume_etag(row.id, row.updated_at, analysis.id if analysis else None)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     result = {
-        "id": resume.id,
-        "filename": resume.filename,
-        "created_at": resume.created_at.isoformat() if resume.created_at else None,
-        "has_analysis": bool(analysis),
-        "file_path": resume.file_path
+        "id": row.id,
+        "filename": row.filename,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "has_analysis": analysis is not None,
+        "file_path": row.file_path
     }
-    
+
     if analysis:
         result["analysis"] = {
             "id": analysis.id,
             "created_at": analysis.created_at.isoformat() if analysis.created_at else None,
             "match_score": analysis.match_score,
-            "data": analysis.analysis_data or {}
+            "data": {
+                "job_description": analysis.job_description,
+                "matched_tech_skills": load_skill_list(analysis.matched_tech_skills),
+                "matched_soft_skills": load_skill_list(analysis.matched_soft_skills),
+                "missing_tech_skills": load_skill_list(analysis.missing_tech_skills),
+                "missing_soft_skills": load_skill_list(analysis.missing_soft_skills),
+                "suggestions": analysis.suggestions
+            }
         }
-    
+
     return result
 
 
@@ -377,6 +786,7 @@ async def get_resume_details(
 async def analyze_pasted_resume(
     resumeText: str = Form(...),
     job_description: str = Form(...),
+    match_mode: MatchMode = Form("greedy"),
     current_user = Depends(auth.get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -386,15 +796,16 @@ async def analyze_pasted_resume(
         job_description,
         db,
         current_user.id,
-        resume_id=None  # No DB ID since it's pasted
+        resume_id=None,  # No DB ID since it's pasted
+        match_mode=match_mode
     )
     
     result = {
         "id": analysis.id,
-        "matched_tech_skills": json.loads(analysis.matched_tech_skills),
-        "matched_soft_skills": json.loads(analysis.matched_soft_skills),
-        "missing_tech_skills": json.loads(analysis.missing_tech_skills),
-        "missing_soft_skills": json.loads(analysis.missing_soft_skills),
+        "matched_tech_skills": load_skill_list(analysis.matched_tech_skills),
+        "matched_soft_skills": load_skill_list(analysis.matched_soft_skills),
+        "missing_tech_skills": load_skill_list(analysis.missing_tech_skills),
+        "missing_soft_skills": load_skill_list(analysis.missing_soft_skills),
         "suggestions": analysis.suggestions
     }
     
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional
+
+# Every secret the app reads. They are fetched together on first use.
+APP_SECRETS = (
+    "DATABASE_URL",
+    "SECRET_KEY",
+    "ALGORITHM",
+    "ACCESS_TOKEN_EXPIRE_MINUTES",
+    "GROQ_API_KEY",
+    "GROQ_MODEL",
+    "HF_TOKEN",
+)
+
+GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID", "stalwart-star-448320-c8")
+# Providers are tried in this order; drop "gcp" to never leave the machine
+SECRET_PROVIDERS = [p.strip() for p in os.getenv("SECRET_PROVIDERS", "env,file,gcp").split(",") if p.strip()]
+# KEY=VALUE file for local development (same format as .env)
+SECRETS_FILE = os.getenv("SECRETS_FILE", ".env")
+SECRET_CACHE_TTL_SECONDS = float(os.getenv("SECRET_CACHE_TTL_SECONDS", 3600))
+# Secrets no provider returned (absent, or a Secret Manager error/timeout) are
+# retried after this long rather than staying missing for the full TTL
+SECRET_MISS_TTL_SECONDS = float(os.getenv("SECRET_MISS_TTL_SECONDS", 30))
+SECRET_FETCH_TIMEOUT_SECONDS = float(os.getenv("SECRET_FETCH_TIMEOUT_SECONDS", 5))
+
+
+class SecretStore:
+    """
+    Resolves secrets from environment variables, a local file and Google
+    Secret Manager, in SECRET_PROVIDERS order, and caches them for a TTL.
+
+    Secret Manager is only contacted for names the other providers do not
+    have; those are fetched concurrently over one shared client. If the
+    client cannot be created (no credentials, offline) Secret Manager is
+    skipped for the rest of the process.
+
+    The TTL only helps values looked up when they are used (get_secret at
+    call time); a value copied into a module constant never sees rotation.
+    DATABASE_URL is the exception: the engine is built from it at startup,
+    so changing it needs a restart.
+    """
+
+    def __init__(self, providers=SECRET_PROVIDERS, secrets_file: str = SECRETS_FILE,
+                 project_id: str = GCP_PROJECT_ID, ttl_seconds: float = SECRET_CACHE_TTL_SECONDS,
+                 timeout: float = SECRET_FETCH_TIMEOUT_SECONDS,
+                 miss_ttl_seconds: float = SECRET_MISS_TTL_SECONDS):
+        self.providers = list(providers)
+        self.secrets_file = secrets_file
+        self.project_id = project_id
+        self.ttl_seconds = ttl_seconds
+        self.miss_ttl_seconds = miss_ttl_seconds
+        self.timeout = timeout
+
+        self._cache: Dict[str, tuple] = {}  # name -> (value or None, expires_at, source)
+        self._lock = threading.Lock()
+        self._file_values: Optional[Dict[str, str]] = None
+        self._gcp_client = None
+        self._gcp_unavailable = False
+        self.fetch_seconds = 0.0
+
+    # Providers
+
+    def _from_env(self, name: str) -> Optional[str]:
+        return os.environ.get(name) or None
+
+    def _from_file(self, name: str) -> Optional[str]:
+        if self._file_values is None:
+            self._file_values = {}
+            if self.secrets_file and os.path.exists(self.secrets_file):
+                from dotenv import dotenv_values
+                self._file_values = {k: v for k, v in dotenv_values(self.secrets_file).items() if v}
+        return self._file_values.get(name)
+
+    def _gcp(self):
+        if self._gcp_client is None and not self._gcp_unavailable:
+            try:
+                from google.cloud import secretmanager
+                self._gcp_client = secretmanager.SecretManagerServiceClient()
+            except Exception as e:
+                print(f"Secret Manager unavailable, using env/file secrets only: {e}")
+                self._gcp_unavailable = True
+        return self._gcp_client
+
+    def _fetch_gcp(self, client, name: str) -> Optional[str]:
+        path = f"projects/{self.project_id}/secrets/{name}/versions/latest"
+        try:
+            response = client.access_secret_version(name=path, timeout=self.timeout)
+            return response.payload.data.decode("UTF-8")
+        except Exception as e:
+            print(f"Error retrieving secret {name}: {e}")
+            return None
+
+    def _fetch_all_gcp(self, names) -> Dict[str, Optional[str]]:
+        client = self._gcp()
+        if client is None or not names:
+            return {}
+        executor = ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="secrets")
+        futures = {name: executor.submit(self._fetch_gcp, client, name) for name in names}
+        wait(futures.values(), timeout=self.timeout + 1)
+        # Do not wait for stragglers; their secrets are treated as missing
+        executor.shutdown(wait=False)
+        return {name: future.result() if future.done() else None for name, future in futures.items()}
+
+    # Cache
+
+    def _cached(self, name: str):
+        entry = self._cache.get(name)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry
+        return None
+
+    def prefetch(self, names: Iterable[str] = APP_SECRETS):
+        """
+        Resolve names in one step; Secret Manager lookups run concurrently.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            pending = [name for name in names if self._cached(name) is None]
+            resolved: Dict[str, tuple] = {}
+            for provider in self.providers:
+                missing = [name for name in pending if name not in resolved]
+                if not missing:
+                    break
+                if provider == "env":
+                    found = {name: self._from_env(name) for name in missing}
+                elif provider == "file":
+                    found = {name: self._from_file(name) for name in missing}
+                elif provider == "gcp":
+                    found = self._fetch_all_gcp(missing)
+                else:
+                    raise ValueError(f"Unknown secret provider {provider!r}")
+                resolved.update({name: (value, provider) for name, value in found.items() if value})
+
+            now = time.monotonic()
+            for name in pending:
+                value, source = resolved.get(name, (None, None))
+                ttl = self.ttl_seconds if value is not None else self.miss_ttl_seconds
+                self._cache[name] = (value, now + ttl, source)
+        self.fetch_seconds += time.perf_counter() - start
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        The secret's value, or default if no provider has it.
+        """
+        entry = self._cached(name)
+        if entry is None:
+            # First use (or expired): resolve everything the app needs at once
+            self.prefetch(set(APP_SECRETS) | {name})
+            entry = self._cache[name]
+        return entry[0] if entry[0] is not None else default
+
+    def sources(self) -> Dict[str, Optional[str]]:
+        """
+        Which provider each cached secret came from (never the values).
+        """
+        return {name: entry[2] for name, entry in self._cache.items()}
+
+
+secret_store = SecretStore()
+
+
+def get_secret(name: str, default: Optional[str] = None) -> Optional[str]:
+    return secret_store.get(name, default)
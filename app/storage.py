@@ -0,0 +1,231 @@
+import asyncio
+import os
+import tempfile
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+
+import anyio
+import httpx
+
+# "local" keeps uploads on disk, "gcs" in a Google Cloud Storage bucket
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+GCS_BUCKET = os.getenv("GCS_BUCKET", "")
+# Set to a fake-gcs-server URL (e.g. http://localhost:4443) to test without GCP
+STORAGE_EMULATOR_HOST = os.getenv("STORAGE_EMULATOR_HOST", "")
+STORAGE_CHUNK_SIZE = int(os.getenv("STORAGE_CHUNK_SIZE", 256 * 1024))
+STORAGE_TIMEOUT_SECONDS = float(os.getenv("STORAGE_TIMEOUT_SECONDS", 60))
+
+
+class StorageError(Exception):
+    pass
+
+
+class ObjectNotFound(StorageError):
+    pass
+
+
+class StorageBackend:
+    """
+    Where uploaded files live, addressed by key. Reads take an optional
+    inclusive byte range (start, end) like an HTTP Range header.
+    """
+    name = "base"
+
+    def staging_dir(self) -> str:
+        """
+        Local directory for uploads that are still being received.
+        """
+        return tempfile.gettempdir()
+
+    async def put_file(self, key: str, local_path: str):
+        """
+        Store a local file under key. The local file may be moved.
+        """
+        raise NotImplementedError
+
+    async def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def stream(self, key: str, start: int = 0, end: Optional[int] = None,
+               chunk_size: int = STORAGE_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        raise NotImplementedError
+
+    async def read(self, key: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        return b"".join([chunk async for chunk in self.stream(key, start, end)])
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class LocalStorage(StorageBackend):
+    """
+    Files under a local directory. Only suitable for a single instance.
+    """
+    name = "local"
+
+    def __init__(self, root: str = UPLOAD_DIR):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        # Rows written before the storage layer stored "uploads/<name>" paths
+        if key.startswith(self.root + os.sep):
+            key = key[len(self.root) + 1:]
+        if os.path.isabs(key) or ".." in key.split("/"):
+            raise StorageError(f"Invalid storage key {key!r}")
+        return os.path.join(self.root, key)
+
+    def staging_dir(self) -> str:
+        # Inside the root so finished uploads can be renamed into place
+        path = os.path.join(self.root, ".incoming")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    async def put_file(self, key: str, local_path: str):
+        path = anyio.Path(self._path(key))
+        await path.parent.mkdir(parents=True, exist_ok=True)
+        await anyio.Path(local_path).replace(path)
+
+    async def size(self, key: str) -> int:
+        try:
+            return (await anyio.Path(self._path(key)).stat()).st_size
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None,
+                     chunk_size: int = STORAGE_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        try:
+            f = await anyio.open_file(self._path(key), "rb")
+        except FileNotFoundError:
+            raise ObjectNotFound(key)
+        async with f:
+            await f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = await f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    async def delete(self, key: str):
+        await anyio.Path(self._path(key)).unlink(missing_ok=True)
+
+
+class GCSStorage(StorageBackend):
+    """
+    Objects in a Google Cloud Storage bucket, through the JSON API.
+    Uploads and downloads are streamed; downloads use Range requests.
+    """
+    name = "gcs"
+
+    def __init__(self, bucket: str = GCS_BUCKET, emulator_host: str = STORAGE_EMULATOR_HOST,
+                 http_client: Optional[httpx.AsyncClient] = None):
+        if not bucket:
+            raise StorageError("GCS_BUCKET must be set for the gcs storage backend")
+        self.bucket = bucket
+        self.endpoint = (emulator_host or "https://storage.googleapis.com").rstrip("/")
+        # The emulator does not check credentials
+        self.anonymous = bool(emulator_host)
+        self.http_client = http_client or httpx.AsyncClient(timeout=STORAGE_TIMEOUT_SECONDS)
+        self._credentials = None
+        self._token_lock = asyncio.Lock()
+
+    def _object_url(self, key: str) -> str:
+        return f"{self.endpoint}/storage/v1/b/{self.bucket}/o/{quote(key, safe='')}"
+
+    async def _headers(self) -> dict:
+        if self.anonymous:
+            return {}
+        async with self._token_lock:
+            if self._credentials is None or not self._credentials.valid:
+                self._credentials = await anyio.to_thread.run_sync(self._refresh_credentials)
+        return {"Authorization": f"Bearer {self._credentials.token}"}
+
+    def _refresh_credentials(self):
+        import google.auth
+        from google.auth.transport.requests import Request
+
+        credentials = self._credentials
+        if credentials is None:
+            credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/devstorage.read_write"])
+        credentials.refresh(Request())
+        return credentials
+
+    async def put_file(self, key: str, local_path: str):
+        async def body():
+            async with await anyio.open_file(local_path, "rb") as f:
+                while True:
+                    chunk = await f.read(STORAGE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        response = await self.http_client.post(
+            f"{self.endpoint}/upload/storage/v1/b/{self.bucket}/o",
+            params={"uploadType": "media", "name": key},
+            headers={**await self._headers(), "Content-Type": "application/octet-stream",
+                     "Content-Length": str(os.path.getsize(local_path))},
+            content=body()
+        )
+        if response.status_code >= 400:
+            raise StorageError(f"Upload of {key} failed: {response.status_code} {response.text}")
+        await anyio.Path(local_path).unlink(missing_ok=True)
+
+    async def size(self, key: str) -> int:
+        response = await self.http_client.get(self._object_url(key), headers=await self._headers())
+        if response.status_code == 404:
+            raise ObjectNotFound(key)
+        if response.status_code >= 400:
+            raise StorageError(f"Metadata of {key} failed: {response.status_code} {response.text}")
+        return int(response.json()["size"])
+
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None,
+                     chunk_size: int = STORAGE_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        headers = await self._headers()
+        if start or end is not None:
+            headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+        request = self.http_client.build_request("GET", self._object_url(key), params={"alt": "media"}, headers=headers)
+        response = await self.http_client.send(request, stream=True)
+        try:
+            if response.status_code == 404:
+                raise ObjectNotFound(key)
+            if response.status_code >= 400:
+                await response.aread()
+                raise StorageError(f"Download of {key} failed: {response.status_code} {response.text}")
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def delete(self, key: str):
+        response = await self.http_client.delete(self._object_url(key), headers=await self._headers())
+        if response.status_code >= 400 and response.status_code != 404:
+            raise StorageError(f"Delete of {key} failed: {response.status_code} {response.text}")
+
+    async def close(self):
+        await self.http_client.aclose()
+
+
+BACKENDS = {
+    LocalStorage.name: LocalStorage,
+    GCSStorage.name: GCSStorage,
+}
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """
+    Return the process-wide storage backend selected by STORAGE_BACKEND.
+    """
+    global _storage
+    if _storage is None:
+        if STORAGE_BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}, expected one of {sorted(BACKENDS)}")
+        _storage = BACKENDS[STORAGE_BACKEND]()
+    return _storage
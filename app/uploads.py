@@ -0,0 +1,142 @@
+import codecs
+import hashlib
+import os
+import uuid
+from typing import Awaitable, Callable, Optional, Tuple
+
+import anyio
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .storage import StorageBackend
+
+# Uploads are copied this many bytes at a time, so memory use does not grow with file size
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 64 * 1024))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, limit: int):
+        super().__init__(f"File is larger than the {limit} byte limit")
+        self.limit = limit
+
+
+class StoredUpload:
+    """
+    An upload written to disk: where it went, its size and SHA-256, and its
+    text when it was decoded on the way in.
+    """
+
+    def __init__(self, path: Optional[str], size: int, sha256: str, text: Optional[str] = None):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.text = text
+
+
+async def iter_upload(upload: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE, max_bytes: int = MAX_UPLOAD_BYTES):
+    """
+    Yield the upload in chunks, raising UploadTooLarge as soon as it passes max_bytes.
+    """
+    size = 0
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(max_bytes)
+        yield chunk
+
+
+async def save_upload(upload: UploadFile, directory: str, decode_text: bool = False,
+                      max_bytes: int = MAX_UPLOAD_BYTES) -> StoredUpload:
+    """
+    Stream an upload to a new file in directory, hashing it (and decoding it
+    as UTF-8 if decode_text) chunk by chunk. A partial file is removed if the
+    upload is too large or cannot be decoded.
+    """
+    extension = os.path.splitext(upload.filename or "")[1]
+    path = os.path.join(directory, f"{uuid.uuid4()}{extension}")
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")() if decode_text else None
+    parts = []
+    size = 0
+
+    try:
+        async with await anyio.open_file(path, "wb") as buffer:
+            async for chunk in iter_upload(upload, max_bytes=max_bytes):
+                digest.update(chunk)
+                size += len(chunk)
+                if decoder is not None:
+                    parts.append(decoder.decode(chunk))
+                await buffer.write(chunk)
+        if decoder is not None:
+            parts.append(decoder.decode(b"", final=True))
+    except BaseException:
+        await anyio.Path(path).unlink(missing_ok=True)
+        raise
+
+    return StoredUpload(path, size, digest.hexdigest(), "".join(parts) if decode_text else None)
+
+
+async def read_upload_text(upload: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> StoredUpload:
+    """
+    Decode an upload as UTF-8 without keeping a copy of its bytes or writing it to disk.
+    """
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = []
+    size = 0
+    async for chunk in iter_upload(upload, max_bytes=max_bytes):
+        digest.update(chunk)
+        size += len(chunk)
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return StoredUpload(None, size, digest.hexdigest(), "".join(parts))
+
+
+async def find_blob(db: AsyncSession, sha256: str) -> Optional[models.UploadBlob]:
+    result = await db.execute(select(models.UploadBlob).where(models.UploadBlob.sha256 == sha256))
+    return result.scalars().first()
+
+
+async def dedupe_upload(db: AsyncSession, stored: StoredUpload, storage: StorageBackend,
+                        extract_text: Optional[Callable[[str], Awaitable[str]]] = None) -> Tuple[models.UploadBlob, bool]:
+    """
+    Content-addressed storage: keep a freshly received upload under
+    <sha256><ext> and record it with its text, or drop it if the same bytes
+    were uploaded before. The text comes from the upload itself (text files)
+    or extract_text(local path), and is only extracted once per blob.
+    Returns the blob and whether it is new.
+    """
+    try:
+        blob = await find_blob(db, stored.sha256)
+        if blob is not None and blob.text is not None:
+            return blob, False
+
+        text = stored.text
+        if text is None and extract_text is not None:
+            text = await extract_text(stored.path)
+
+        if blob is not None:
+            blob.text = text or None
+            return blob, False
+
+        key = f"{stored.sha256}{os.path.splitext(stored.path)[1]}"
+        # Identical bytes, so overwriting an object left by a concurrent upload is harmless
+        await storage.put_file(key, stored.path)
+
+        blob = models.UploadBlob(sha256=stored.sha256, file_path=key, size=stored.size, text=text or None)
+        try:
+            async with db.begin_nested():
+                db.add(blob)
+        except IntegrityError:
+            # The same file was recorded by a concurrent upload
+            return await find_blob(db, stored.sha256), False
+        return blob, True
+    finally:
+        await anyio.Path(stored.path).unlink(missing_ok=True)
@@ -0,0 +1,94 @@
+"""
+Authentication load test.
+
+Sends authenticated GET /users/me requests concurrently, first with the
+token cache disabled and then enabled, and reports how many SQL statements
+each request ran and the request latency.
+
+    python -m benchmarks.auth_load --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(num_requests, concurrency):
+    import httpx
+    from sqlalchemy import event
+    from app import auth
+    from app.database import engine, Base
+    from app.main import app
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/users/", json={"username": "bench", "email": "bench@example.com", "password": "bench"})
+            token = (await client.post("/token", data={"username": "bench", "password": "bench"})).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def request(latencies):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get("/users/me", headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+
+            for label, ttl in (("cache off", 0), ("cache on", auth.AUTH_CACHE_TTL_SECONDS or 60)):
+                auth.auth_cache.clear()
+                auth.auth_cache.ttl_seconds = ttl
+                latencies = []
+                # One request first, as a logged-in user's first request fills the cache
+                await request(latencies)
+                latencies.clear()
+                statements.clear()
+                start = time.perf_counter()
+                await asyncio.gather(*[request(latencies) for _ in range(num_requests)])
+                results[label] = (time.perf_counter() - start, len(statements), latencies)
+    finally:
+        await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per run")
+    parser.add_argument("--concurrency", type=int, default=50, help="requests in flight at once")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="auth-load-bench-")
+    os.chdir(workdir)
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{workdir}/bench.db")
+
+    results = asyncio.run(run(args.requests, args.concurrency))
+
+    print(f"requests:            {args.requests} per run ({args.concurrency} concurrent)")
+    for label, (elapsed, queries, latencies) in results.items():
+        print(f"{label}")
+        print(f"  SQL statements:    {queries} ({queries / args.requests:.2f} per request)")
+        print(f"  throughput:        {args.requests / elapsed:.0f} req/s")
+        print(f"  latency p50:       {statistics.median(latencies) * 1000:.1f} ms")
+        print(f"  latency p99:       {percentile(latencies, 99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark.
+
+Starts fresh interpreters that import app.main and run the startup handlers,
+and reports the import-to-ready time. Secret Manager is replaced in the child
+by an in-process fake with configurable latency, so runs are repeatable and
+need no credentials. Point --app-dir at another checkout to compare revisions:
+
+    python -m benchmarks.cold_start --runs 5
+    git worktree add /tmp/before HEAD~1
+    python -m benchmarks.cold_start --app-dir /tmp/before
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SECRET_NAMES = (
+    "DATABASE_URL", "SECRET_KEY", "ALGORITHM", "ACCESS_TOKEN_EXPIRE_MINUTES",
+    "GROQ_API_KEY", "GROQ_MODEL", "HF_TOKEN",
+)
+
+CHILD = r"""
+import asyncio, json, sys, time, types
+start = time.perf_counter()
+config = json.loads(sys.argv[1])
+sys.path.insert(0, config["app_dir"])
+
+import google.cloud
+
+class SecretManagerServiceClient:
+    def __init__(self, *args, **kwargs):
+        time.sleep(config["client_latency"])  # credential discovery and channel set-up
+
+    def access_secret_version(self, name, timeout=None):
+        time.sleep(config["latency"])
+        secret_id = name.split("/")[3]
+        if secret_id not in config["secrets"]:
+            raise KeyError(secret_id)
+        payload = types.SimpleNamespace(data=config["secrets"][secret_id].encode())
+        return types.SimpleNamespace(payload=payload)
+
+fake = types.ModuleType("google.cloud.secretmanager")
+fake.SecretManagerServiceClient = SecretManagerServiceClient
+sys.modules["google.cloud.secretmanager"] = fake
+google.cloud.secretmanager = fake
+
+from app.main import app
+imported = time.perf_counter()
+
+async def startup():
+    # Runs the startup handlers on entry and the shutdown handlers on exit
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(startup())
+print(json.dumps({"import": imported - start, "ready": ready - start}))
+"""
+
+
+def run_once(app_dir: str, secrets, latency: float, client_latency: float):
+    workdir = tempfile.mkdtemp(prefix="cold-start-")
+    config = {
+        "app_dir": app_dir,
+        "latency": latency,
+        "client_latency": client_latency,
+        "secrets": dict(secrets, DATABASE_URL=f"sqlite+aiosqlite:///{workdir}/bench.db"),
+    }
+    # Secrets must come from the (fake) Secret Manager, not the environment
+    env = {k: v for k, v in os.environ.items() if k not in SECRET_NAMES}
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps(config)],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    if result.returncode:
+        raise SystemExit(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=ROOT, help="checkout to measure")
+    parser.add_argument("--runs", type=int, default=5, help="interpreters to start (median is reported)")
+    parser.add_argument("--latency", type=float, default=0.08, help="seconds per Secret Manager lookup")
+    parser.add_argument("--client-latency", type=float, default=0.25, help="seconds to create a client")
+    args = parser.parse_args()
+
+    secrets = {
+        "SECRET_KEY": "bench-secret",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+        "GROQ_API_KEY": "bench-key",
+        "GROQ_MODEL": "gemma2-9b-it",
+        "HF_TOKEN": "bench-token",
+    }
+    runs = [run_once(args.app_dir, secrets, args.latency, args.client_latency) for _ in range(args.runs)]
+
+    print(f"app dir:             {args.app_dir}")
+    print(f"secret latency:      {args.latency * 1000:.0f} ms per lookup, {args.client_latency * 1000:.0f} ms per client")
+    print(f"import app.main:     {statistics.median(r['import'] for r in runs) * 1000:8.1f} ms (median of {args.runs})")
+    print(f"import to ready:     {statistics.median(r['ready'] for r in runs) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare the embedding backends: per-request latency and throughput when
+embedding a resume-sized batch of skills.
+
+    python -m benchmarks.embedding_backends --model-dir models/all-MiniLM-L6-v2
+
+The Hugging Face backend is run against the local stub server unless
+--hf-url is given, so its numbers reflect --hf-latency rather than the
+real Inference API; pass the real URL (and HF_TOKEN) to measure that.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.stub_llm_server import start_stub_server
+
+SKILLS = [
+    "Python", "SQL", "FastAPI", "Docker", "Kubernetes", "PostgreSQL", "React", "TypeScript",
+    "Machine Learning", "REST APIs", "CI/CD", "AWS", "Git", "Linux", "Redis", "GraphQL",
+    "Communication", "Teamwork", "Leadership", "Problem Solving",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def measure(backend, requests: int, concurrency: int):
+    # Warm-up: first call pays connection set-up / session initialisation
+    await backend.embed(SKILLS)
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await backend.embed(SKILLS)
+        latencies.append(time.perf_counter() - start)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await backend.embed(SKILLS)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    throughput = requests / (time.perf_counter() - start)
+
+    return latencies, throughput
+
+
+async def run(backends, requests: int, concurrency: int):
+    for backend in backends:
+        latencies, throughput = await measure(backend, requests, concurrency)
+        print(f"{backend.name:12s} p50 {statistics.median(latencies) * 1000:8.2f} ms"
+              f"  p99 {percentile(latencies, 99) * 1000:8.2f} ms"
+              f"  throughput {throughput:8.1f} req/s  ({len(SKILLS)} skills/request)")
+        await backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--model-dir", default=os.getenv("EMBEDDING_MODEL_DIR", "models/all-MiniLM-L6-v2"))
+    parser.add_argument("--hf-url", default=None, help="real feature-extraction URL instead of the stub")
+    parser.add_argument("--hf-latency", type=float, default=0.15, help="stub latency per call (s)")
+    args = parser.parse_args()
+
+    from app.ml.embeddings import HuggingFaceEmbeddingBackend, LocalEmbeddingBackend
+
+    server = None
+    hf_url = args.hf_url
+    if hf_url is None:
+        server, _, base_url = start_stub_server(args.hf_latency)
+        hf_url = f"{base_url}/embeddings"
+
+    backends = [HuggingFaceEmbeddingBackend(api_url=hf_url)]
+
+    if os.path.exists(os.path.join(args.model_dir, "model.onnx")):
+        start = time.perf_counter()
+        local = LocalEmbeddingBackend(model_dir=args.model_dir)
+        local.load()
+        print(f"local model loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+        backends.append(local)
+    else:
+        print(f"skipping local backend: no model.onnx in {args.model_dir}")
+
+    try:
+        asyncio.run(run(backends, args.requests, args.concurrency))
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Load test for the async LLM layer.
+
+Runs a batch of full skill analyses concurrently against a local stub of the
+Groq and Hugging Face APIs and reports whether the upstream calls overlapped.
+
+    python -m benchmarks.llm_load_test --requests 20 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.stub_llm_server import start_stub_server
+
+SAMPLE_RESUME = "Backend engineer with Python, SQL and FastAPI experience. Strong communicator."
+SAMPLE_JOB = "Looking for a Python developer with Docker and SQL skills who works well in a team."
+
+
+async def run(num_requests: int):
+    from app.ml.skill_matcher import SkillMatcher
+
+    matcher = SkillMatcher()
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        matcher.analyze_resume(SAMPLE_RESUME, SAMPLE_JOB) for _ in range(num_requests)
+    ])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="concurrent analyses to run")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub latency per upstream call (s)")
+    args = parser.parse_args()
+
+    server, stats, base_url = start_stub_server(args.latency)
+    os.environ["GROQ_BASE_URL"] = base_url
+    os.environ["GROQ_API_KEY"] = os.environ.get("GROQ_API_KEY") or "stub-key"
+    os.environ["HF_API_URL"] = f"{base_url}/embeddings"
+
+    try:
+        elapsed = asyncio.run(run(args.requests))
+    finally:
+        server.shutdown()
+
+    serial = stats.requests * args.latency
+    print(f"analyses:            {args.requests}")
+    print(f"upstream calls:      {stats.requests}")
+    print(f"max calls in flight: {stats.max_in_flight}")
+    print(f"wall time:           {elapsed:.2f}s")
+    print(f"serial estimate:     {serial:.2f}s")
+    print(f"overlap factor:      {serial / elapsed:.1f}x")
+
+    from app.ml.skill_cache import skill_cache
+    from app.ml.vector_store import get_skill_vector_store
+    print(f"extraction cache:    {skill_cache.stats()}")
+    print(f"skill vectors:       {get_skill_vector_store().stats()}")
+    if stats.max_in_flight <= 1:
+        raise SystemExit("FAIL: upstream calls did not overlap")
+
+
+if __name__ == "__main__":
+    main()
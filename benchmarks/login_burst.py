@@ -0,0 +1,95 @@
+"""
+Login burst benchmark.
+
+Fires a burst of concurrent POST /token logins while a probe keeps calling
+an unrelated endpoint (GET /), and reports login throughput and the probe's
+latency during the burst.
+
+    python -m benchmarks.login_burst --logins 40 --concurrency 20
+    python -m benchmarks.login_burst --workers 0     # hash on the event loop, for comparison
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(num_logins, concurrency):
+    import httpx
+    from app.database import engine, Base
+    from app.main import app
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            await client.post("/users/", json={"username": "bench", "email": "bench@example.com", "password": "bench"})
+            semaphore = asyncio.Semaphore(concurrency)
+            login_latencies = []
+            probe_latencies = []
+            done = asyncio.Event()
+
+            async def login():
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.post("/token", data={"username": "bench", "password": "bench"})
+                    login_latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+
+            async def probe():
+                while not done.is_set():
+                    # Timed from when the request was due, so a blocked loop counts against it
+                    due = time.perf_counter() + 0.01
+                    await asyncio.sleep(0.01)
+                    (await client.get("/")).raise_for_status()
+                    probe_latencies.append(time.perf_counter() - due)
+
+            prober = asyncio.create_task(probe())
+            start = time.perf_counter()
+            await asyncio.gather(*[login() for _ in range(num_logins)])
+            elapsed = time.perf_counter() - start
+            done.set()
+            await prober
+    finally:
+        await engine.dispose()
+    return elapsed, login_latencies, probe_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40, help="logins in the burst")
+    parser.add_argument("--concurrency", type=int, default=20, help="logins in flight at once")
+    parser.add_argument("--workers", type=int, default=None, help="PASSWORD_HASH_WORKERS (0 = on the event loop)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="login-burst-bench-")
+    os.chdir(workdir)
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{workdir}/bench.db")
+    if args.workers is not None:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+
+    elapsed, logins, probes = asyncio.run(run(args.logins, args.concurrency))
+
+    from app.auth import PASSWORD_HASH_WORKERS
+    print(f"logins:              {args.logins} ({args.concurrency} concurrent)")
+    print(f"hash workers:        {PASSWORD_HASH_WORKERS or 'event loop'}")
+    print(f"login throughput:    {args.logins / elapsed:.1f} logins/s")
+    print(f"login latency p50:   {statistics.median(logins) * 1000:.0f} ms")
+    print(f"login latency p99:   {percentile(logins, 99) * 1000:.0f} ms")
+    print(f"GET / during burst:  {len(probes)} requests")
+    print(f"GET / latency p50:   {statistics.median(probes) * 1000:.1f} ms")
+    print(f"GET / latency p99:   {percentile(probes, 99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Parse-time benchmark for PDF text extraction.
+
+Compares pdfminer's full extract_text with the page-streaming extractor that
+stops at the character budget, on a generated long document and on the
+sample resumes in uploads/.
+
+    python -m benchmarks.pdf_extraction --pages 40 --budget 20000
+"""
+import argparse
+import glob
+import os
+import statistics
+import tempfile
+import time
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads")
+
+LINES = [
+    "Senior backend engineer with eight years of experience building Python services.",
+    "Designed FastAPI and Django APIs backed by PostgreSQL, Redis and Celery workers.",
+    "Led migration of a monolith to containerised services on Kubernetes and GCP.",
+    "Mentored junior developers and ran weekly code reviews and design sessions.",
+]
+
+
+def write_long_pdf(path: str, pages: int, lines_per_page: int = 40):
+    """
+    Write a plain text-only PDF with the given number of pages.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for n in range(pages):
+        text = " ".join(
+            f"({LINES[i % len(LINES)]} Page {n + 1}.) Tj T*" for i in range(lines_per_page)
+        )
+        stream = f"BT /F1 10 Tf 14 TL 50 760 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def time_call(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def compare(label, path, budget, max_pages, repeat):
+    from pdfminer.high_level import extract_text
+    from app.pdf_extraction import read_pdf_text
+
+    full_time, full_text = time_call(lambda: extract_text(path), repeat)
+    budget_time, budget_text = time_call(lambda: read_pdf_text(path, max_pages, budget), repeat)
+    assert full_text.startswith(budget_text), "budgeted text should be a prefix of the full text"
+
+    saved = 100 * (1 - budget_time / full_time) if full_time else 0
+    print(f"{label}")
+    print(f"  full extract_text:   {full_time * 1000:8.1f} ms  {len(full_text):7d} chars")
+    print(f"  budgeted pages:      {budget_time * 1000:8.1f} ms  {len(budget_text):7d} chars")
+    print(f"  parse time saved:    {saved:7.1f} %")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40, help="pages in the generated long document")
+    parser.add_argument("--budget", type=int, default=20000, help="character budget (PDF_CHAR_BUDGET)")
+    parser.add_argument("--max-pages", type=int, default=1000, help="page cap for the budgeted extractor")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        long_pdf = os.path.join(workdir, "long.pdf")
+        write_long_pdf(long_pdf, args.pages)
+        compare(f"generated document, {args.pages} pages", long_pdf, args.budget, args.max_pages, args.repeat)
+
+    for path in sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.pdf")))[:1]:
+        compare(f"sample resume {os.path.basename(path)}", path, args.budget, args.max_pages, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
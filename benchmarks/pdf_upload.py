@@ -0,0 +1,127 @@
+"""
+Upload benchmark for PDF resumes.
+
+Uploads a batch of PDFs concurrently through POST /resume/upload and reports
+request latency and how long the event loop was stalled meanwhile.
+
+    python -m benchmarks.pdf_upload --uploads 40 --concurrency 8
+    python -m benchmarks.pdf_upload --workers 0     # parse on the event loop, for comparison
+"""
+import argparse
+import asyncio
+import glob
+import os
+import statistics
+import tempfile
+import time
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def watch_loop(lags, interval=0.01):
+    """
+    Records how late each wakeup is; a blocked loop shows up as a large lag.
+    """
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(pdfs, num_uploads, concurrency):
+    from app.database import engine, Base
+    from app.main import app
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        return await upload_batch(app, pdfs, num_uploads, concurrency)
+    finally:
+        from app.pdf_extraction import shutdown_pdf_pool
+        shutdown_pdf_pool()
+        await engine.dispose()
+
+
+async def upload_batch(app, pdfs, num_uploads, concurrency):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await client.post("/users/", json={"username": "bench", "email": "bench@example.com", "password": "bench"})
+        token = (await client.post("/token", data={"username": "bench", "password": "bench"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def upload(n):
+            path = pdfs[n % len(pdfs)]
+            with open(path, "rb") as f:
+                data = f.read()
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/resume/upload",
+                    headers=headers,
+                    data={"name": f"resume-{n}"},
+                    files={"file": (os.path.basename(path), data, "application/pdf")}
+                )
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        # Warm up the parser pool so process start-up is not counted
+        await upload(0)
+        latencies.clear()
+
+        lags = []
+        watcher = asyncio.create_task(watch_loop(lags))
+        start = time.perf_counter()
+        await asyncio.gather(*[upload(n) for n in range(num_uploads)])
+        elapsed = time.perf_counter() - start
+        watcher.cancel()
+
+    return latencies, lags, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=40, help="number of uploads")
+    parser.add_argument("--concurrency", type=int, default=8, help="uploads in flight at once")
+    parser.add_argument("--workers", type=int, default=None, help="PDF_WORKERS (default: CPU count, 0 = inline)")
+    parser.add_argument("--samples", default=SAMPLE_DIR, help="directory of sample PDFs")
+    args = parser.parse_args()
+
+    pdfs = sorted(glob.glob(os.path.join(os.path.abspath(args.samples), "*.pdf")))
+    if not pdfs:
+        raise SystemExit(f"No PDFs found in {args.samples}")
+
+    # Keep the benchmark's database and uploaded files out of the working tree
+    workdir = tempfile.mkdtemp(prefix="pdf-upload-bench-")
+    os.chdir(workdir)
+    os.makedirs("uploads", exist_ok=True)
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{workdir}/bench.db")
+    os.environ["GROQ_API_KEY"] = os.environ.get("GROQ_API_KEY") or "stub-key"
+    if args.workers is not None:
+        os.environ["PDF_WORKERS"] = str(args.workers)
+
+    latencies, lags, elapsed = asyncio.run(run(pdfs, args.uploads, args.concurrency))
+
+    from app.pdf_extraction import PDF_WORKERS
+    print(f"sample PDFs:         {len(pdfs)}")
+    print(f"uploads:             {args.uploads} ({args.concurrency} concurrent)")
+    print(f"pdf workers:         {PDF_WORKERS or 'inline'}")
+    print(f"wall time:           {elapsed:.2f}s")
+    print(f"latency p50:         {statistics.median(latencies) * 1000:.0f} ms")
+    print(f"latency p99:         {percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"max event loop lag:  {max(lags, default=0) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+How the skill match modes scale with the number of skills.
+
+Builds random unit embeddings for n resume skills and n job skills, computes
+the similarity matrix once, and times each assignment mode on it.
+
+    python -m benchmarks.skill_assignment --sizes 10 50 100 250 500 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.ml.similarity import MATCH_MODES, assign_skills, cosine_similarity_matrix
+
+THRESHOLD = 0.40
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 250, 500, 1000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-optimal", type=int, default=1000, help="skip the optimal mode above this size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'n':>6} {'matrix':>10} " + " ".join(f"{mode:>16}" for mode in MATCH_MODES))
+    for n in args.sizes:
+        # Correlated embeddings so a realistic share of pairs clears the threshold
+        base = rng.standard_normal((n, args.dim)).astype(np.float32)
+        resume = base + 0.8 * rng.standard_normal((n, args.dim)).astype(np.float32)
+        job = base[rng.permutation(n)] + 0.8 * rng.standard_normal((n, args.dim)).astype(np.float32)
+
+        matrix_time, similarity = timed(lambda: cosine_similarity_matrix(resume, job), args.repeat)
+
+        cells = []
+        for mode in MATCH_MODES:
+            if mode == "optimal" and n > args.max_optimal:
+                cells.append(f"{'skipped':>16}")
+                continue
+            elapsed, pairs = timed(lambda: assign_skills(similarity, THRESHOLD, mode), args.repeat)
+            cells.append(f"{elapsed * 1000:9.2f} ms {len(pairs):4d}p")
+        print(f"{n:>6} {matrix_time * 1000:7.2f} ms " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Local stand-in for the Groq chat completions API and the Hugging Face
+feature-extraction endpoint, used by the load tests and benchmarks.
+
+Every request sleeps for a fixed latency and the server records how many
+requests were in flight at once, so callers can check that their requests
+actually overlap.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+EMBEDDING_DIM = 384
+
+SKILLS_RESPONSE = {
+    "technical_skills": ["Python", "SQL", "FastAPI", "Docker"],
+    "soft_skills": ["Communication", "Teamwork"],
+}
+
+SUGGESTIONS = "Add measurable outcomes to your experience section and mention Docker explicitly."
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM):
+    """
+    Deterministic pseudo-embedding for a string.
+    """
+    seed = int.from_bytes(hashlib.sha256(text.lower().encode("utf-8")).digest()[:4], "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32).tolist()
+
+
+class StubStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.requests += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+
+def make_handler(stats: StubStats, latency: float, stream_delay: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            stats.enter()
+            try:
+                time.sleep(latency)
+                if self.path.endswith("/chat/completions") and request.get("stream"):
+                    self._send_stream(request)
+                elif self.path.endswith("/chat/completions"):
+                    self._send_json(self._completion(request))
+                else:
+                    self._send_json([fake_embedding(text) for text in request.get("inputs", [])])
+            finally:
+                stats.leave()
+
+        def _send_stream(self, request):
+            # Server-sent chat.completion.chunk events, one word at a time
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            words = SUGGESTIONS.split(" ")
+            for i, word in enumerate(words):
+                chunk = {
+                    "id": "stub-chunk",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"content": word if i == 0 else " " + word},
+                        "finish_reason": None,
+                    }],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(stream_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def _completion(self, request):
+            system_prompt = request["messages"][0]["content"]
+            if "extracts skills" in system_prompt:
+                content = json.dumps(SKILLS_RESPONSE)
+            else:
+                content = SUGGESTIONS
+            return {
+                "id": "stub-completion",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+
+    return Handler
+
+
+def start_stub_server(latency: float = 0.2, stream_delay: float = 0.05):
+    """
+    Start the stub server on a free local port in a background thread.
+    latency is the wait before any response; streamed completions then wait
+    stream_delay between chunks. Returns (server, stats, base_url).
+    """
+    stats = StubStats()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(stats, latency, stream_delay))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, stats, f"http://{host}:{port}"
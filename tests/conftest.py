@@ -0,0 +1,47 @@
+import os
+
+# The app refuses to start without a DATABASE_URL; tests use a local SQLite file
+os.environ.setdefault("USE_LOCAL_SQLITE", "true")
+
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base
+
+
+@pytest_asyncio.fixture
+async def db_engine(tmp_path):
+    """
+    A fresh SQLite database with every table created.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db_sessions(db_engine):
+    """
+    Session factory for db_engine, for tests that need several sessions.
+    """
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture
+async def db(db_sessions):
+    async with db_sessions() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def sql_statements(db_engine):
+    """
+    Every SQL statement run on db_engine, in order; clear() it before the part under test.
+    """
+    statements = []
+    event.listen(db_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
@@ -0,0 +1,60 @@
+import asyncio
+
+from app.analysis_jobs import AnalysisJobQueue, QueueFullError
+
+
+class FakeAnalysis:
+    def __init__(self, id):
+        self.id = id
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def analyze_resume(self, resume_text, job_description, db, user_id, resume_id=None, match_mode="greedy"):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if resume_text == "boom":
+            raise ValueError("bad resume")
+        return FakeAnalysis(len(resume_text))
+
+
+def test_jobs_run_on_bounded_pool_and_report_results():
+    queue = AnalysisJobQueue(workers=2, max_queued=10)
+    queue.analyzer = FakeAnalyzer()
+
+    async def scenario():
+        await queue.start()
+        jobs = [queue.submit(1, "x" * n, "job") for n in range(1, 6)]
+        failed = queue.submit(1, "boom", "job")
+        for job in jobs + [failed]:
+            await queue.wait(job, 5)
+        await queue.stop()
+        return jobs, failed
+
+    jobs, failed = asyncio.run(scenario())
+
+    assert [job.status for job in jobs] == ["completed"] * 5
+    assert [job.analysis_id for job in jobs] == [1, 2, 3, 4, 5]
+    assert failed.status == "failed" and failed.error == "Analysis failed"
+    assert queue.analyzer.max_running == 2
+    assert queue.get(jobs[0].id, user_id=1) is jobs[0]
+    assert queue.get(jobs[0].id, user_id=2) is None
+
+
+def test_submit_rejects_when_queue_is_full():
+    queue = AnalysisJobQueue(workers=1, max_queued=1)
+
+    async def scenario():
+        queue.submit(1, "resume", "job")
+        try:
+            queue.submit(1, "resume", "job")
+        except QueueFullError:
+            return True
+        return False
+
+    assert asyncio.run(scenario())
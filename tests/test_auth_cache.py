@@ -0,0 +1,61 @@
+import time
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app import auth, models
+from app.auth import AuthCache
+
+
+def test_cache_expires_with_the_token():
+    cache = AuthCache(max_size=2, ttl_seconds=60)
+    user = models.User(id=1, username="alice", email="a@x.io", hashed_password="h", is_active=True)
+
+    cache.put("expired", user, token_expires_at=time.time() - 1)
+    cache.put("valid", user, token_expires_at=time.time() + 300)
+
+    assert cache.get("expired") is None
+    copy = cache.get("valid")
+    assert copy is not user
+    assert (copy.id, copy.username, copy.is_active) == (1, "alice", True)
+
+    # Bounded: the least recently used token is evicted
+    cache.put("second", user)
+    cache.put("third", user)
+    assert cache.get("valid") is None
+    assert cache.stats()["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_skips_the_database_until_the_user_changes(db_sessions, sql_statements, monkeypatch):
+    monkeypatch.setattr(auth, "auth_cache", AuthCache(ttl_seconds=60))
+
+    async def current_user(token):
+        async with db_sessions() as db:
+            return await auth.get_current_user(token, db)
+
+    async with db_sessions() as db:
+        db.add(models.User(username="alice", email="a@x.io", hashed_password="h"))
+        await db.commit()
+    token = auth.create_access_token({"sub": "alice"}, timedelta(minutes=5))
+
+    sql_statements.clear()
+    first = await current_user(token)
+    second = await current_user(token)
+    assert len(sql_statements) == 1
+    assert first.is_active and second.is_active
+
+    # Deactivating through the ORM drops the cached entry
+    async with db_sessions() as db:
+        user = await db.get(models.User, first.id)
+        user.is_active = False
+        await db.commit()
+    assert (await current_user(token)).is_active is False
+
+    # So does a bulk update
+    await current_user(token)
+    async with db_sessions() as db:
+        await db.execute(update(models.User).values(is_active=True))
+        await db.commit()
+    assert (await current_user(token)).is_active is True
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql
+
+from app import models
+from app.routers.resume import (
+    HISTORY_DEFAULT_FIELDS, decode_history_cursor, encode_history_cursor, get_analysis_history, load_skill_list,
+    missing_skill_clause
+)
+
+
+def test_cursor_round_trips():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 123456)
+
+    cursor = encode_history_cursor(created_at, 42)
+
+    assert "=" not in cursor
+    assert decode_history_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["@@", "bm90LWEtY3Vyc29y", ""])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_history_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_skill_lists_accept_encoded_and_native_json():
+    assert load_skill_list('["python", "sql"]') == ["python", "sql"]
+    assert load_skill_list(["python"]) == ["python"]
+    assert load_skill_list(None) == []
+
+
+@pytest.mark.asyncio
+async def test_history_pages_through_ties_with_fields_and_skill_filter(db_engine, db):
+    base = datetime(2025, 1, 1)
+    # ids 2-5 share a timestamp, so pages must split on id as well
+    created = {1: base, 2: base.replace(day=2), 3: base.replace(day=2), 4: base.replace(day=2),
+               5: base.replace(day=2), 6: base.replace(day=3), 7: base.replace(day=4)}
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(models.ResumeAnalysis.__table__), [
+            {"id": i, "user_id": 1, "resume_id": 10 + i, "created_at": created[i], "job_description": "jd",
+             "missing_tech_skills": ["Go"] if i % 2 else ["Rust"], "missing_soft_skills": []}
+            for i in created
+        ] + [{"id": 8, "user_id": 2, "resume_id": 18, "created_at": base, "job_description": "jd",
+              "missing_tech_skills": ["Go"], "missing_soft_skills": []}])
+
+    async def pages(**params):
+        seen, cursors, cursor = [], [], None
+        while True:
+            response = Response()
+            page = await get_analysis_history(response, limit=2, cursor=cursor, current_user=models.User(id=1),
+                                              db=db, **{"fields": None, "missing_skill": None, **params})
+            seen.extend(page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                return seen, cursors
+            cursors.append(cursor)
+
+    everything, cursors = await pages()
+    assert [item["id"] for item in everything] == [7, 6, 5, 4, 3, 2, 1]
+    assert len(cursors) == 3
+    assert set(everything[0]) == set(HISTORY_DEFAULT_FIELDS)
+
+    projected, _ = await pages(fields="resume_id,missing_tech_skills")
+    assert projected[0] == {"resume_id": 17, "missing_tech_skills": ["Go"]}
+    assert [item["resume_id"] for item in projected] == [17, 16, 15, 14, 13, 12, 11]
+
+    missing_go, _ = await pages(missing_skill="Go")
+    assert [item["id"] for item in missing_go] == [7, 5, 3, 1]
+
+
+def test_missing_skill_filter_casts_on_postgres():
+    query = select(models.ResumeAnalysis.id).where(missing_skill_clause("postgresql", "Go"))
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    # Works whether or not app.migrations has converted the columns from json yet
+    assert "CAST(resume_analyses.missing_tech_skills AS JSONB) @>" in sql
+    assert "CAST(resume_analyses.missing_soft_skills AS JSONB) @>" in sql
@@ -0,0 +1,25 @@
+import time
+
+from app.lru import LRUCache
+
+
+def test_least_recently_used_key_is_evicted_and_lookups_are_counted():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert dict(cache.items()) == {"a": 1, "c": 3}
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_expired_entries_are_dropped_on_lookup():
+    cache = LRUCache(max_size=2)
+    cache.put("old", 1, expires_at=time.monotonic() - 1)
+    cache.put("new", 2, expires_at=time.monotonic() + 60)
+
+    assert cache.get("old") is None
+    assert cache.get("new") == 2
+    assert len(cache) == 1
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import migrations, models
+from app.routers.resume import missing_skill_clause
+
+
+@pytest.mark.asyncio
+async def test_double_encoded_skills_are_rewritten_in_batches(db_engine):
+    table = models.ResumeAnalysis.__table__
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(models.Resume.__table__), [
+            {"id": 1, "filename": "cv.pdf", "match_score": 75.0},
+            {"id": 2, "filename": "never-analyzed.pdf", "match_score": 10.0},
+        ])
+        await conn.execute(insert(table), [
+            # Written by the old analyzer: json.dumps'ed lists
+            {"id": 1, "missing_tech_skills": json.dumps(["Go", "Rust"]), "missing_soft_skills": json.dumps([]),
+             "matched_tech_skills": json.dumps(["Python"]), "matched_soft_skills": json.dumps(["Teamwork"])},
+            {"id": 2, "missing_tech_skills": json.dumps(["Python"]), "missing_soft_skills": json.dumps(["Go"]),
+             "matched_tech_skills": json.dumps([]), "matched_soft_skills": None},
+            {"id": 3, "missing_tech_skills": ["Java"], "missing_soft_skills": [],
+             "matched_tech_skills": ["Go"], "matched_soft_skills": []},
+        ])
+        await conn.execute(insert(table), [
+            # Scored before matches were counted per job skill: 3 resume skills matched "A"
+            {"id": 4, "resume_id": 1, "match_score": 75.0, "missing_tech_skills": ["B"], "missing_soft_skills": [],
+             "matched_tech_skills": [{"job_skill": "A", "resume_skill": f"A{i}"} for i in range(3)],
+             "matched_soft_skills": []},
+        ])
+
+    await migrations.run(batch_size=2, engine=db_engine)
+    again = await migrations.rewrite_analyses(db_engine, batch_size=2)
+    async with db_engine.connect() as conn:
+        rows = {row.id: row for row in (await conn.execute(select(table))).all()}
+        resume_scores = dict((await conn.execute(select(models.Resume.id, models.Resume.match_score))).all())
+        missing_go = (await conn.execute(
+            select(table.c.id).where(missing_skill_clause("sqlite", "Go")).order_by(table.c.id)
+        )).scalars().all()
+
+    assert rows[1].missing_tech_skills == ["Go", "Rust"]
+    assert rows[1].matched_soft_skills == ["Teamwork"]
+    assert rows[2].missing_soft_skills == ["Go"]
+    assert rows[2].matched_soft_skills is None
+    assert rows[3].missing_tech_skills == ["Java"]
+    # Scores are filled in for rows written before match_score existed
+    assert rows[1].match_score == 50.0
+    assert rows[2].match_score == 0.0
+    assert rows[3].match_score == 50.0
+    assert rows[4].match_score == 50.0
+    assert resume_scores == {1: 50.0, 2: 10.0}
+    assert again == 0
+    # Matched skills do not count, and the soft skill column is searched too
+    assert missing_go == [1, 2]
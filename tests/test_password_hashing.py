@@ -0,0 +1,27 @@
+import asyncio
+import threading
+
+from app import auth
+
+
+def test_password_hashing_runs_off_the_event_loop(monkeypatch):
+    monkeypatch.setattr(auth, "PASSWORD_HASH_WORKERS", 1)
+    threads = []
+    real_hash = auth.pwd_context.hash
+
+    def record_hash(password):
+        threads.append(threading.current_thread().name)
+        return real_hash(password)
+
+    monkeypatch.setattr(auth.pwd_context, "hash", record_hash)
+
+    async def scenario():
+        hashed = await auth.get_password_hash_async("secret")
+        return hashed, await auth.verify_password_async("secret", hashed), \
+            await auth.verify_password_async("wrong", hashed)
+
+    hashed, right, wrong = asyncio.run(scenario())
+
+    assert right and not wrong
+    assert threads[0].startswith("passwords")
+    assert threads[0] != threading.main_thread().name
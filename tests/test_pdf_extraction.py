@@ -0,0 +1,40 @@
+import asyncio
+import glob
+import os
+
+import pytest
+
+from app.pdf_extraction import extract_pdf_text, iter_page_text, read_pdf_text, shutdown_pdf_pool
+
+SAMPLES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads", "*.pdf")))
+
+
+@pytest.mark.skipif(not SAMPLES, reason="no sample PDFs")
+def test_pdf_text_is_extracted_in_the_pool_with_a_page_cap():
+    async def scenario():
+        try:
+            full, first_page = await asyncio.gather(
+                extract_pdf_text(SAMPLES[0]),
+                extract_pdf_text(SAMPLES[0], max_pages=1)
+            )
+        finally:
+            shutdown_pdf_pool()
+        return full, first_page
+
+    full, first_page = asyncio.run(scenario())
+    assert first_page.strip()
+    assert full.startswith(first_page.rstrip("\x0c"))
+
+
+@pytest.mark.skipif(not SAMPLES, reason="no sample PDFs")
+def test_page_streaming_matches_extract_text_and_stops_at_budget():
+    from pdfminer.high_level import extract_text
+
+    full = extract_text(SAMPLES[0])
+    assert read_pdf_text(SAMPLES[0], char_budget=0) == full
+
+    pages = list(iter_page_text(SAMPLES[0]))
+    assert "".join(pages) == full
+
+    budgeted = read_pdf_text(SAMPLES[0], char_budget=len(pages[0]) + 10)
+    assert budgeted == full[:len(pages[0]) + 10]
@@ -0,0 +1,34 @@
+import time
+
+from app.profiling import StartupProfile, parse_importtime
+
+
+def test_parse_importtime_sums_self_time_per_package():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:       500 |        500 |     sqlalchemy.sql",
+        "import time:      1500 |       2000 |   sqlalchemy",
+        "import time:      3000 |       5000 | app.main",
+        "some unrelated warning",
+    ]
+
+    totals = parse_importtime(lines)
+
+    assert totals == {"sqlalchemy": 0.002, "app": 0.003}
+
+
+def test_startup_profile_records_milestones_and_phases():
+    profile = StartupProfile()
+
+    with profile.phase("db_ready"):
+        time.sleep(0.01)
+    profile.mark("ready")
+    first = profile.milestones["ready"]
+    profile.mark("ready")
+
+    report = profile.report()
+    assert report["durations"]["db_ready"] >= 0.01
+    assert "secrets" in report["durations"]
+    # A milestone keeps its first value
+    assert report["milestones"]["ready"] == first
+    assert first >= report["milestones"]["app_import_started"]
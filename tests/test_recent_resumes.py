@@ -0,0 +1,27 @@
+import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from app import models
+from app.routers.resume import get_recent_resumes
+
+
+@pytest.mark.asyncio
+async def test_recent_resumes_status_in_one_query(db_engine, db, sql_statements):
+    base = datetime.datetime(2025, 1, 1)
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(models.Resume.__table__), [
+            {"id": i, "user_id": 1 if i < 4 else 2, "filename": f"cv{i}.pdf",
+             "created_at": base + datetime.timedelta(days=i)}
+            for i in range(1, 5)
+        ])
+        await conn.execute(insert(models.ResumeAnalysis.__table__), [
+            {"resume_id": 2, "user_id": 1}, {"resume_id": 2, "user_id": 1}, {"resume_id": 4, "user_id": 2},
+        ])
+
+    sql_statements.clear()
+    recent = await get_recent_resumes(limit=5, current_user=models.User(id=1), db=db)
+
+    assert [(r["id"], r["status"]) for r in recent] == [(3, "uploaded"), (2, "analyzed"), (1, "uploaded")]
+    assert len([s for s in sql_statements if s.lstrip().upper().startswith("SELECT")]) == 1
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import insert
+
+from app import models
+from app.routers.resume import etag_matches, get_resume_details, resume_etag
+
+
+def test_etag_changes_with_a_new_analysis():
+    updated_at = datetime(2025, 3, 1, 12, 0)
+    etag = resume_etag(7, updated_at, 3)
+
+    assert etag.startswith('W/"')
+    assert etag == resume_etag(7, updated_at, 3)
+    assert etag != resume_etag(7, updated_at, 4)
+    assert etag != resume_etag(7, None, None)
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = resume_etag(7, None, 3)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+@pytest.mark.asyncio
+async def test_resume_details_latest_analysis_in_one_query(db_engine, db_sessions, sql_statements):
+    base = datetime(2025, 1, 1)
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(models.Resume.__table__), [
+            {"id": 1, "user_id": 1, "filename": "cv.pdf", "updated_at": base},
+            {"id": 2, "user_id": 2, "filename": "other.pdf", "updated_at": base},
+        ])
+        # Inserted out of order: the latest is chosen by created_at, not id
+        await conn.execute(insert(models.ResumeAnalysis.__table__), [
+            {"id": 1, "resume_id": 1, "user_id": 1, "created_at": base.replace(day=3), "match_score": 80.0,
+             "missing_tech_skills": ["Go"]},
+            {"id": 2, "resume_id": 1, "user_id": 1, "created_at": base.replace(day=2), "match_score": 40.0,
+             "missing_tech_skills": ["Rust"]},
+        ])
+
+    async def details(resume_id, user_id=1, if_none_match=None):
+        async with db_sessions() as db:
+            response = Response()
+            body = await get_resume_details(resume_id, response, if_none_match=if_none_match,
+                                            current_user=models.User(id=user_id), db=db)
+            return body, response
+
+    sql_statements.clear()
+    body, response = await details(1)
+    assert body["has_analysis"] is True
+    assert body["analysis"]["id"] == 1
+    assert body["analysis"]["match_score"] == 80.0
+    assert body["analysis"]["data"]["missing_tech_skills"] == ["Go"]
+    assert len([s for s in sql_statements if s.lstrip().upper().startswith("SELECT")]) == 1
+    assert response.headers["ETag"] == resume_etag(1, base, 1)
+
+    cached, _ = await details(1, if_none_match=response.headers["ETag"])
+    assert cached.status_code == 304 and cached.body == b""
+    assert cached.headers["ETag"] == response.headers["ETag"]
+
+    with pytest.raises(HTTPException) as not_found:
+        await details(2)
+    assert not_found.value.status_code == 404
@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, insert, select
+
+from app import models
+from app.resume_analyzer import ResumeAnalyzer
+
+
+def analysis_result(skill):
+    return {
+        "matched_tech_skills": [], "matched_soft_skills": [],
+        "missing_tech_skills": [skill], "missing_soft_skills": [],
+        "suggestions": "s",
+        "resume_profile": {
+            "technical_skills": ["Python"], "soft_skills": [],
+            "technical_embeddings": [[0.1, 0.2]], "soft_embeddings": None
+        }
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_analyses_of_one_resume_are_all_saved(db_engine, db_sessions):
+    analyzer = ResumeAnalyzer()
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(models.Resume.__table__), [{"id": 1, "user_id": 1, "filename": "cv.pdf"}])
+
+    async def first_analysis(skill):
+        async with db_sessions() as db:
+            # Neither has seen a stored profile, so both save one
+            assert await analyzer.load_resume_profile(db, 1, "hash") is None
+            return await analyzer._save_analysis(db, "jd", 1, 1, "hash", analysis_result(skill), save_profile=True)
+
+    saved = await asyncio.gather(*[first_analysis(skill) for skill in ("Go", "Rust", "Java", "Scala")])
+
+    async with db_sessions() as db:
+        analyses = (await db.execute(select(func.count()).select_from(models.ResumeAnalysis))).scalar()
+        profile = await analyzer.load_resume_profile(db, 1, "hash")
+    assert len(saved) == 4 and analyses == 4
+    assert profile["technical_skills"] == ["Python"]
+    assert profile["technical_embeddings"] == [[0.1, 0.2]]
@@ -0,0 +1,135 @@
+import sys
+import threading
+import time
+import types
+
+import pytest
+from jose import JWTError, jwt
+
+from app import auth, secret_store
+from app.ml import llm_integration
+from app.secret_store import SecretStore
+
+
+class FakeSecretManager:
+    def __init__(self, values, delay=0.0):
+        self.values = values
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def access_secret_version(self, name, timeout=None):
+        secret_id = name.split("/")[3]
+        with self._lock:
+            self.calls.append(secret_id)
+        time.sleep(self.delay)
+        if secret_id not in self.values:
+            raise KeyError(secret_id)
+        payload = types.SimpleNamespace(data=self.values[secret_id].encode())
+        return types.SimpleNamespace(payload=payload)
+
+
+def make_store(monkeypatch, fake, **kwargs):
+    store = SecretStore(**kwargs)
+    monkeypatch.setattr(store, "_gcp", lambda: fake)
+    return store
+
+
+def test_env_and_file_take_precedence_over_secret_manager(monkeypatch, tmp_path):
+    secrets_file = tmp_path / "secrets.env"
+    secrets_file.write_text("ALGORITHM=HS512\nSECRET_KEY=from-file\n")
+    monkeypatch.setenv("SECRET_KEY", "from-env")
+    monkeypatch.delenv("ALGORITHM", raising=False)
+    fake = FakeSecretManager({"SECRET_KEY": "from-gcp", "ALGORITHM": "from-gcp"})
+    store = make_store(monkeypatch, fake, secrets_file=str(secrets_file))
+
+    store.prefetch(["SECRET_KEY", "ALGORITHM"])
+
+    assert store.get("SECRET_KEY") == "from-env"
+    assert store.get("ALGORITHM") == "HS512"
+    assert store.sources() == {"SECRET_KEY": "env", "ALGORITHM": "file"}
+    assert fake.calls == []
+
+
+def test_secret_manager_fetches_are_batched_and_cached(monkeypatch, tmp_path):
+    names = ["DATABASE_URL", "SECRET_KEY", "GROQ_API_KEY", "HF_TOKEN"]
+    for name in names:
+        monkeypatch.delenv(name, raising=False)
+    fake = FakeSecretManager({name: f"{name}-value" for name in names}, delay=0.2)
+    store = make_store(monkeypatch, fake, secrets_file=str(tmp_path / "missing.env"))
+
+    start = time.perf_counter()
+    store.prefetch(names)
+    elapsed = time.perf_counter() - start
+
+    # Lookups run concurrently, not one round trip after another
+    assert elapsed < 0.2 * len(names) / 2
+    assert store.get("GROQ_API_KEY") == "GROQ_API_KEY-value"
+    assert store.get("HF_TOKEN") == "HF_TOKEN-value"
+    assert sorted(fake.calls) == sorted(names)
+
+
+def test_missing_secret_uses_default_and_expires(monkeypatch, tmp_path):
+    monkeypatch.delenv("GROQ_MODEL", raising=False)
+    fake = FakeSecretManager({})
+    store = make_store(monkeypatch, fake, secrets_file=str(tmp_path / "missing.env"), ttl_seconds=60)
+
+    store.prefetch(["GROQ_MODEL"])
+    assert store.get("GROQ_MODEL", "gemma2-9b-it") == "gemma2-9b-it"
+    assert fake.calls == ["GROQ_MODEL"]
+
+    # Rotated in Secret Manager; picked up once the cached entry expires
+    fake.values["GROQ_MODEL"] = "llama3-8b"
+    assert store.get("GROQ_MODEL") is None
+    store._cache["GROQ_MODEL"] = (None, time.monotonic() - 1, None)
+    assert store.get("GROQ_MODEL") == "llama3-8b"
+
+
+def test_unavailable_secret_manager_is_skipped(monkeypatch, tmp_path):
+    # Any import failure (package missing, no credentials) means offline
+    monkeypatch.setitem(sys.modules, "google.cloud.secretmanager", None)
+    monkeypatch.setenv("SECRET_KEY", "local")
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    store = SecretStore(secrets_file=str(tmp_path / "missing.env"))
+
+    assert store.get("DATABASE_URL", "sqlite+aiosqlite://") == "sqlite+aiosqlite://"
+    assert store.get("SECRET_KEY") == "local"
+    assert store._gcp_unavailable
+
+
+def test_failed_lookup_is_retried_after_the_miss_ttl(monkeypatch, tmp_path):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    fake = FakeSecretManager({})
+    store = make_store(monkeypatch, fake, providers=["gcp"], ttl_seconds=3600, miss_ttl_seconds=0.05)
+
+    store.prefetch(["GROQ_API_KEY"])
+    assert store.get("GROQ_API_KEY") is None
+    # The transient error has passed
+    fake.values["GROQ_API_KEY"] = "key"
+    assert store.get("GROQ_API_KEY") is None
+    time.sleep(0.1)
+
+    assert store.get("GROQ_API_KEY") == "key"
+    assert fake.calls.count("GROQ_API_KEY") == 2
+
+
+def test_rotated_secrets_are_used_once_the_cache_expires(monkeypatch):
+    fake = FakeSecretManager({"SECRET_KEY": "old-key", "GROQ_API_KEY": "old-groq", "GROQ_MODEL": "gemma2-9b-it"})
+    for name in ("SECRET_KEY", "ALGORITHM", "GROQ_API_KEY", "GROQ_MODEL"):
+        monkeypatch.delenv(name, raising=False)
+    store = make_store(monkeypatch, fake, providers=["gcp"], ttl_seconds=3600)
+    monkeypatch.setattr(secret_store, "secret_store", store)
+    monkeypatch.setattr(llm_integration, "_client", None)
+
+    old_token = auth.create_access_token({"sub": "alice"})
+    old_client = llm_integration.get_llm_client()
+    fake.values.update({"SECRET_KEY": "new-key", "GROQ_API_KEY": "new-groq", "GROQ_MODEL": "llama3-8b"})
+    store._cache.clear()
+
+    new_token = auth.create_access_token({"sub": "alice"})
+    assert jwt.decode(new_token, "new-key", algorithms=["HS256"])["sub"] == "alice"
+    with pytest.raises(JWTError):
+        jwt.decode(old_token, auth.secret_key(), algorithms=[auth.jwt_algorithm()])
+    assert llm_integration.get_llm_client() is not old_client
+    assert llm_integration.get_llm_client().api_key == "new-groq"
+    assert llm_integration.groq_model() == "llama3-8b"
@@ -0,0 +1,58 @@
+import numpy as np
+
+from app.ml.similarity import assign_skills, best_matches, cosine_similarity_matrix, optimal_assignment
+
+
+def test_cosine_similarity_matrix_matches_pairwise_loop():
+    rng = np.random.default_rng(0)
+    resume = rng.standard_normal((7, 16))
+    job = rng.standard_normal((5, 16)) * 3
+
+    similarity = cosine_similarity_matrix(resume, job)
+
+    assert similarity.shape == (7, 5)
+    assert similarity.dtype == np.float32
+    for i in range(7):
+        expected = job @ resume[i] / (np.linalg.norm(job, axis=1) * np.linalg.norm(resume[i]))
+        np.testing.assert_allclose(similarity[i], expected, rtol=1e-5, atol=1e-6)
+
+
+def test_best_matches_takes_argmax_per_row():
+    similarity = np.array([[0.1, 0.9, 0.3], [0.8, 0.2, 0.5]], dtype=np.float32)
+
+    best_idx, best_scores = best_matches(similarity)
+
+    assert best_idx.tolist() == [1, 0]
+    np.testing.assert_allclose(best_scores, [0.9, 0.8])
+
+
+def _brute_force_best_total(similarity, threshold):
+    import itertools
+    gain = np.where(similarity >= threshold, similarity, 0)
+    n, m = gain.shape
+    if n <= m:
+        return max(sum(gain[i, p[i]] for i in range(n)) for p in itertools.permutations(range(m), n))
+    return max(sum(gain[p[j], j] for j in range(m)) for p in itertools.permutations(range(n), m))
+
+
+def test_optimal_assignment_is_one_to_one_and_maximal():
+    rng = np.random.default_rng(1)
+    for shape in [(4, 4), (3, 6), (6, 3), (5, 5)]:
+        similarity = rng.uniform(0, 1, shape).astype(np.float32)
+
+        pairs = optimal_assignment(similarity, 0.4)
+
+        assert len({i for i, _, _ in pairs}) == len(pairs)
+        assert len({j for _, j, _ in pairs}) == len(pairs)
+        assert all(score >= 0.4 for _, _, score in pairs)
+        total = sum(score for _, _, score in pairs)
+        assert abs(total - _brute_force_best_total(similarity, 0.4)) < 1e-4
+
+
+def test_modes_differ_when_two_resume_skills_want_one_job_skill():
+    # Both resume skills are closest to job skill 0; resume skill 1 also fits job skill 1
+    similarity = np.array([[0.95, 0.10], [0.90, 0.85]], dtype=np.float32)
+
+    assert [(i, j) for i, j, _ in assign_skills(similarity, 0.4, "greedy")] == [(0, 0), (1, 0)]
+    assert [(i, j) for i, j, _ in assign_skills(similarity, 0.4, "optimal")] == [(0, 0), (1, 1)]
+    assert [(i, j) for i, j, _ in assign_skills(similarity, 0.4, "sparse")] == [(0, 0), (1, 1)]
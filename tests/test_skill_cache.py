@@ -0,0 +1,58 @@
+import asyncio
+
+from app import resume_analyzer
+from app.ml import llm_integration
+from app.ml.skill_cache import SkillExtractionCache, make_cache_key
+
+
+def test_cache_key_ignores_whitespace_but_not_model_or_prompt():
+    key = make_cache_key("Python,  SQL\n and Docker", "gemma2-9b-it", "1")
+    assert key == make_cache_key("  Python, SQL and   Docker ", "gemma2-9b-it", "1")
+    assert key != make_cache_key("Python, SQL and Docker", "llama3-8b", "1")
+    assert key != make_cache_key("Python, SQL and Docker", "gemma2-9b-it", "2")
+
+
+def test_cache_is_bounded_lru_and_counts_hits():
+    cache = SkillExtractionCache(max_size=2, persist=False)
+
+    async def scenario():
+        await cache.set("a", ["Python"], ["Teamwork"], "m", "1")
+        await cache.set("b", ["SQL"], [], "m", "1")
+        assert await cache.get("a") == (["Python"], ["Teamwork"])
+        await cache.set("c", ["Docker"], [], "m", "1")  # evicts "b", the least recently used
+        assert await cache.get("b") is None
+        assert await cache.get("c") == (["Docker"], [])
+
+    asyncio.run(scenario())
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == round(2 / 3, 4)
+
+
+def test_only_the_skill_prompt_is_cut_to_the_budget(monkeypatch):
+    prompted = []
+
+    async def request_skills(text, model):
+        prompted.append(text)
+        return ["Python"], []
+
+    async def extract_pdf_text(file_path, **kwargs):
+        return "x" * kwargs["char_budget"] if kwargs.get("char_budget") else "x" * 50
+
+    monkeypatch.setattr(llm_integration, "SKILL_PROMPT_CHAR_BUDGET", 10)
+    monkeypatch.setattr(llm_integration, "skill_cache", SkillExtractionCache(persist=False))
+    monkeypatch.setattr(llm_integration, "_request_skills", request_skills)
+    monkeypatch.setattr(resume_analyzer, "extract_pdf_text", extract_pdf_text)
+
+    async def scenario():
+        stored = await resume_analyzer.ResumeAnalyzer().extract_text_from_pdf("resume.pdf")
+        await llm_integration.extract_skills_from_text(stored)
+        return stored
+
+    stored = asyncio.run(scenario())
+
+    assert len(stored) == 50
+    assert prompted == ["x" * 10]
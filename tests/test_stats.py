@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+
+from app import models
+from app.resume_analyzer import compute_match_score
+from app.routers.resume import top_missing_skills, top_missing_skills_query
+
+
+def match(job_skill, resume_skill):
+    return {"job_skill": job_skill, "resume_skill": resume_skill, "similarity": 0.9}
+
+
+def test_match_score_is_share_of_skills_matched():
+    assert compute_match_score({"matched_tech_skills": [match("Python", "Python")],
+                                "matched_soft_skills": [match("Teamwork", "Collaboration")],
+                                "missing_tech_skills": ["Go"], "missing_soft_skills": []}) == 66.7
+    assert compute_match_score({"matched_tech_skills": [], "missing_tech_skills": []}) is None
+
+
+def test_match_score_counts_each_job_skill_once():
+    # Greedy matching: three resume skills all matched job skill A, B is missing
+    result = {"matched_tech_skills": [match("A", "A1"), match("A", "A2"), match("A", "A3")],
+              "missing_tech_skills": ["B"]}
+    assert compute_match_score(result) == 50.0
+
+
+@pytest.mark.asyncio
+async def test_top_missing_skills_counted_in_sql(db_engine, db):
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(models.ResumeAnalysis.__table__), [
+            {"user_id": 1, "missing_tech_skills": ["Go", "Rust"]},
+            {"user_id": 1, "missing_tech_skills": ["Go"]},
+            # Not yet migrated: skipped rather than counted character by character
+            {"user_id": 1, "missing_tech_skills": '["Go"]'},
+            {"user_id": 2, "missing_tech_skills": ["Rust", "Rust"]},
+        ])
+
+    assert await top_missing_skills(db, 1, "missing_tech_skills", 5) == [
+        {"skill": "Go", "count": 2}, {"skill": "Rust", "count": 1}
+    ]
+
+
+def test_top_missing_skills_casts_on_postgres():
+    query = top_missing_skills_query("postgresql", 1, "missing_tech_skills", 5)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    # Works whether or not app.migrations has converted the column from json yet
+    assert "CAST(resume_analyses.missing_tech_skills AS JSONB) AS skills" in sql
+    assert "jsonb_typeof(CAST(resume_analyses.missing_tech_skills AS JSONB))" in sql
+    assert "JOIN jsonb_array_elements_text(" in sql
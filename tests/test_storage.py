@@ -0,0 +1,91 @@
+import asyncio
+import re
+from urllib.parse import unquote
+
+import httpx
+import pytest
+
+from app.storage import GCSStorage, LocalStorage, ObjectNotFound
+
+DATA = bytes(range(256)) * 40
+
+
+class FakeGCS:
+    """
+    In-memory stand-in for the parts of the GCS JSON API the backend uses.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.ranges = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "POST" and path == "/upload/storage/v1/b/resumes/o":
+            self.objects[request.url.params["name"]] = request.read()
+            return httpx.Response(200, json={"name": request.url.params["name"]})
+
+        # Object names are percent-encoded into a single path segment
+        match = re.fullmatch(r"/storage/v1/b/resumes/o/([^/]+)", request.url.raw_path.decode().split("?")[0])
+        key = unquote(match.group(1)) if match else None
+        if key not in self.objects:
+            return httpx.Response(404)
+        data = self.objects[key]
+        if request.method == "DELETE":
+            del self.objects[key]
+            return httpx.Response(204)
+        if request.url.params.get("alt") != "media":
+            return httpx.Response(200, json={"name": key, "size": str(len(data))})
+        if "Range" in request.headers:
+            self.ranges.append(request.headers["Range"])
+            first, last = request.headers["Range"][len("bytes="):].split("-")
+            data = data[int(first):int(last) + 1 if last else None]
+            return httpx.Response(206, content=data)
+        return httpx.Response(200, content=data)
+
+
+def write_local_file(tmp_path):
+    path = tmp_path / "incoming.pdf"
+    path.write_bytes(DATA)
+    return str(path)
+
+
+def test_local_storage_streams_byte_ranges(tmp_path):
+    storage = LocalStorage(str(tmp_path / "uploads"))
+
+    async def scenario():
+        await storage.put_file("a/resume.pdf", write_local_file(tmp_path))
+        assert await storage.size("a/resume.pdf") == len(DATA)
+        assert await storage.read("a/resume.pdf") == DATA
+        chunks = [chunk async for chunk in storage.stream("a/resume.pdf", 100, 5000, chunk_size=1024)]
+        assert b"".join(chunks) == DATA[100:5001]
+        assert max(len(chunk) for chunk in chunks) == 1024
+        # Rows from before the storage layer hold "<root>/<key>"
+        assert await storage.read(f"{storage.root}/a/resume.pdf", 0, 9) == DATA[:10]
+        await storage.delete("a/resume.pdf")
+        with pytest.raises(ObjectNotFound):
+            await storage.size("a/resume.pdf")
+
+    asyncio.run(scenario())
+
+
+def test_gcs_storage_against_fake_bucket(tmp_path):
+    fake = FakeGCS()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    storage = GCSStorage(bucket="resumes", emulator_host="http://fake-gcs", http_client=client)
+
+    async def scenario():
+        local_path = write_local_file(tmp_path)
+        await storage.put_file("abc/resume.pdf", local_path)
+        assert fake.objects["abc/resume.pdf"] == DATA
+        assert await storage.size("abc/resume.pdf") == len(DATA)
+        assert await storage.read("abc/resume.pdf", 10, 19) == DATA[10:20]
+        assert await storage.read("abc/resume.pdf") == DATA
+        await storage.delete("abc/resume.pdf")
+        with pytest.raises(ObjectNotFound):
+            await storage.size("abc/resume.pdf")
+        await storage.close()
+
+    asyncio.run(scenario())
+    assert fake.ranges == ["bytes=10-19"]
+    assert not (tmp_path / "incoming.pdf").exists()
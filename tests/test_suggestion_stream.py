@@ -0,0 +1,90 @@
+import types
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app import models, resume_analyzer
+from app.ml import llm_integration
+from app.routers.resume import _sse_response
+
+
+class LLMStream:
+    """
+    An LLM stream that sends one chunk and then either ends or drops the connection.
+    """
+
+    def __init__(self, fail: bool):
+        self.fail = fail
+        self.sent = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.sent:
+            if self.fail:
+                raise ConnectionError("connection reset by peer")
+            raise StopAsyncIteration
+        self.sent = True
+        delta = types.SimpleNamespace(content="Add Go ")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+
+@pytest.fixture
+def streaming_analyzer(monkeypatch, db_sessions):
+    """
+    A ResumeAnalyzer on the test database with skill matching stubbed out;
+    set .llm_fails to make the LLM drop the connection mid-stream.
+    """
+    monkeypatch.setattr(resume_analyzer, "AsyncSessionLocal", db_sessions)
+    analyzer = resume_analyzer.ResumeAnalyzer()
+    analyzer.llm_fails = False
+
+    async def create(**kwargs):
+        return LLMStream(fail=analyzer.llm_fails)
+
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    monkeypatch.setattr(llm_integration, "get_llm_client", lambda: client)
+
+    async def match_resume(resume_text, job_description, resume_profile, match_mode):
+        return {"matched_tech_skills": [], "matched_soft_skills": [],
+                "missing_tech_skills": ["Go"], "missing_soft_skills": [], "resume_profile": None}
+
+    monkeypatch.setattr(analyzer.skill_matcher, "match_resume", match_resume)
+    return analyzer
+
+
+async def stream_body(db_engine, analyzer):
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(models.Resume.__table__), [{"id": 1, "user_id": 1, "filename": "cv.pdf"}])
+    response = _sse_response(analyzer.stream_analysis("resume", "jd", 1, 1))
+    body = "".join([chunk async for chunk in response.body_iterator])
+    async with db_engine.connect() as conn:
+        saved = (await conn.execute(select(func.count()).select_from(models.ResumeAnalysis))).scalar()
+    return body, saved
+
+
+@pytest.mark.asyncio
+async def test_llm_failure_mid_stream_is_an_error_event_and_nothing_is_saved(db_engine, streaming_analyzer):
+    streaming_analyzer.llm_fails = True
+
+    body, saved = await stream_body(db_engine, streaming_analyzer)
+
+    assert 'event: suggestion\ndata: {"text": "Add Go "}' in body
+    assert body.endswith('event: error\ndata: {"detail": "Unable to generate suggestions"}\n\n')
+    assert "Error:" not in body and "event: done" not in body
+    assert saved == 0
+
+
+@pytest.mark.asyncio
+async def test_save_failure_details_stay_out_of_the_stream(db_engine, streaming_analyzer, monkeypatch):
+    async def save_analysis(*args, **kwargs):
+        raise IntegrityError("INSERT INTO resume_analyses (secret_column) VALUES (?)", ("secret-param",), None)
+
+    monkeypatch.setattr(streaming_analyzer, "_save_analysis", save_analysis)
+
+    body, _ = await stream_body(db_engine, streaming_analyzer)
+
+    assert body.endswith('event: error\ndata: {"detail": "Analysis failed"}\n\n')
+    assert "INSERT" not in body and "secret" not in body
@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.routers.resume import analyze_resume_text
+from app.storage import LocalStorage
+from app.uploads import UploadTooLarge, dedupe_upload, read_upload_text, save_upload
+
+
+def make_upload(data: bytes, filename: str = "resume.txt") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+
+def test_save_upload_streams_hashes_and_decodes(tmp_path):
+    # Multi-byte characters straddle the chunk boundaries
+    data = ("Résumé — naïve café " * 5000).encode("utf-8")
+    stored = asyncio.run(save_upload(make_upload(data), str(tmp_path), decode_text=True))
+
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert stored.text == data.decode("utf-8")
+    with open(stored.path, "rb") as f:
+        assert f.read() == data
+
+
+def test_oversized_upload_is_rejected_and_removed(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(save_upload(make_upload(b"x" * 1000), str(tmp_path), max_bytes=100))
+    assert os.listdir(tmp_path) == []
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(read_upload_text(make_upload(b"x" * 1000), max_bytes=100))
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_blob(tmp_path, db_sessions):
+    uploads = tmp_path / "uploads"
+    storage = LocalStorage(str(uploads))
+    extracted = []
+
+    async def extract(path):
+        extracted.append(path)
+        with open(path) as f:
+            return f.read()
+
+    async def upload(data):
+        async with db_sessions() as db:
+            stored = await save_upload(make_upload(data, "resume.pdf"), storage.staging_dir())
+            blob, created = await dedupe_upload(db, stored, storage, extract_text=extract)
+            await db.commit()
+            return blob, created
+
+    first, created_first = await upload(b"same bytes")
+    second, created_second = await upload(b"same bytes")
+    other, _ = await upload(b"other bytes")
+
+    assert created_first and not created_second
+    assert second.file_path == first.file_path == f"{hashlib.sha256(b'same bytes').hexdigest()}.pdf"
+    assert second.text == "same bytes"
+    assert other.file_path != first.file_path
+    assert len(extracted) == 2
+    assert sorted(os.listdir(uploads)) == sorted([".incoming", first.file_path, other.file_path])
+    assert os.listdir(uploads / ".incoming") == []
+
+
+@pytest.mark.parametrize("data, detail", [
+    ("Résumé".encode("latin-1"), "Text files must be UTF-8 encoded"),
+    (b"", "No resume text provided"),
+])
+@pytest.mark.asyncio
+async def test_analyze_text_rejects_unreadable_uploads(data, detail):
+    with pytest.raises(HTTPException) as exc:
+        await analyze_resume_text(
+            job_description="jd", resume_file=make_upload(data), resume_text=None,
+            match_mode="greedy", current_user=None, db=None
+        )
+    assert exc.value.status_code == 400
+    assert exc.value.detail == detail
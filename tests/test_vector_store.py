@@ -0,0 +1,42 @@
+import numpy as np
+
+from app.ml import vector_store
+from app.ml.vector_store import SkillVectorStore
+
+
+def test_lookup_only_reports_unseen_skills(tmp_path):
+    store = SkillVectorStore(directory=str(tmp_path), model="m", lru_size=8)
+
+    found, missing = store.lookup(["Python", " python ", "SQL"])
+    assert found == {}
+    assert missing == ["python", "sql"]
+
+    store.add(missing, np.eye(2, 4, dtype=np.float32))
+    found, missing = store.lookup(["PYTHON", "Sql", "Docker"])
+    assert missing == ["docker"]
+    np.testing.assert_array_equal(found["python"], [1, 0, 0, 0])
+    assert store.stats()["lru_hits"] == 2
+
+
+def test_vectors_survive_reload_and_growth(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "INITIAL_CAPACITY", 4)
+    vectors = np.random.default_rng(0).standard_normal((10, 3)).astype(np.float32)
+    keys = [f"skill {i}" for i in range(10)]
+
+    store = SkillVectorStore(directory=str(tmp_path), model="m")
+    store.add(keys[:3], vectors[:3])
+    store.add(keys[3:], vectors[3:])
+    assert store.capacity == 16
+
+    reloaded = SkillVectorStore(directory=str(tmp_path), model="m")
+    found, missing = reloaded.lookup(keys)
+    assert missing == []
+    np.testing.assert_array_equal(np.stack([found[key] for key in keys]), vectors)
+    assert reloaded.stats()["store_hits"] == 10
+
+
+def test_store_is_reset_when_the_model_changes(tmp_path):
+    SkillVectorStore(directory=str(tmp_path), model="old").add(["python"], [[1.0, 0.0]])
+
+    store = SkillVectorStore(directory=str(tmp_path), model="new")
+    assert store.lookup(["python"])[1] == ["python"]